@@ -100,6 +100,7 @@ CREATE TABLE IF NOT EXISTS _migration_log (
     migrated_at TIMESTAMPTZ DEFAULT NOW(),
     status TEXT DEFAULT 'success',
     error_message TEXT,
+    source_hash TEXT,  -- md5(data::text) del origen al migrar/sincronizar (--sync)
     UNIQUE(ruc, target_db)
 );
 
@@ -178,6 +179,7 @@ CREATE TABLE IF NOT EXISTS _migration_log (
     migrated_at TIMESTAMPTZ DEFAULT NOW(),
     status TEXT DEFAULT 'success',
     error_message TEXT,
+    source_hash TEXT,  -- md5(data::text) del origen al migrar/sincronizar (--sync)
     UNIQUE(ruc, target_db)
 );
 
@@ -31,6 +31,14 @@ CREATE TABLE IF NOT EXISTS public.companies_raw (
 CREATE INDEX IF NOT EXISTS idx_companies_raw_ruc ON public.companies_raw(ruc);
 CREATE INDEX IF NOT EXISTS idx_companies_raw_data ON public.companies_raw USING gin(data);
 
+-- Filtros por data->>'scrape_status' (migrate_companies.py: migración, --stats,
+-- --sync, --update-logos). El GIN de arriba no sirve para ->> = 'valor'.
+CREATE INDEX IF NOT EXISTS idx_companies_raw_scrape_status
+    ON public.companies_raw ((data->>'scrape_status'));
+-- Parcial: RUCs enriquecidos (anti-join de pendientes contra _migration_log)
+CREATE INDEX IF NOT EXISTS idx_companies_raw_enriched_ruc
+    ON public.companies_raw (ruc) WHERE data->>'scrape_status' = 'enriched';
+
 -- ============================================
 -- Estructura del campo `data` (JSONB)
 -- ============================================
@@ -5,36 +5,174 @@ Script para analizar el padrón RUC y aplicar Pareto
 - Analiza distribución de trabajadores
 - Aplica Pareto 20/80
 - Genera datasets priorizados para scraping
+
+Si existe el dataset particionado (convert_ruc_to_parquet.py --dataset) se lee
+con filtros de pyarrow.dataset: Estado=ACTIVO y los tiers solo abren sus
+particiones, y los conteos por Estado salen de la metadata.
+
+Uso:
+    python3 analyze_pareto.py               # análisis completo
+    python3 analyze_pareto.py --solo-tiers  # solo tier1-3 / prioridad (requiere dataset)
 """
 
+import argparse
+from collections import Counter
+
+import numpy as np
 import pandas as pd
-import pyarrow.parquet as pq
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 from pathlib import Path
 import json
 
+from padron import COLUMNS, open_dataset, parquet_schema, size_codes, tier_categorical
+from padron_pareto import ParetoHistogram, order_desc
+
 # Configuración
 DATA_DIR = Path("/home/jimmy/sueldos-organigrama/data")
 INPUT_FILE = DATA_DIR / "padron_ruc_juridicas.parquet"
+DATASET_DIR = DATA_DIR / "padron_ruc_juridicas"
 
-def main():
+ACTIVO = ds.field('Estado') == 'ACTIVO'
+
+
+# Etiqueta por código de tamaño + 1 (ver padron.size_codes)
+TAMANOS = np.array([
+    'Sin dato', 'Micro (<10)', 'Micro-mediana (10-49)', 'Micro-mediana (10-49)',
+    'Pequeña (50-99)', 'Mediana (100-499)', 'Grande (500-999)', 'Gran empresa (>=1000)',
+], dtype=object)
+
+# Archivos por tier (mismo nombre para .parquet y .csv)
+TIER_FILES = {'tier1': 'tier1_mega', 'tier2': 'tier2_grandes', 'tier3': 'tier3_medianas'}
+
+
+def clasificar_tamano(nro) -> np.ndarray:
+    """Segmento de tamaño de cada empresa, vectorizado (un np.digitize)."""
+    return TAMANOS[size_codes(nro) + 1]
+
+
+def a_historico(tabla):
+    """Tabla del dataset → columnas y tipos del Parquet plano (todo string)."""
+    return tabla.select(COLUMNS).cast(parquet_schema()).to_pandas()
+
+
+def contar_por_estado(dataset) -> pd.Series:
+    """value_counts de Estado sin leer datos: filas de cada fragmento según su metadata."""
+    conteo = Counter()
+    for fragment in dataset.get_fragments():
+        claves = ds.get_partition_keys(fragment.partition_expression)
+        conteo[claves['Estado']] += fragment.count_rows()
+    serie = pd.Series(conteo, name='count', dtype='int64').sort_values(ascending=False)
+    serie.index.name = 'Estado'
+    return serie
+
+
+def acumulados(df_sorted, total_trabajadores, total_empresas):
+    """Columnas Pareto sobre un prefijo (orden desc) del ranking de empresas con trabajadores."""
+    df_sorted['trabajadores_acum'] = df_sorted['NroTrab_num'].cumsum()
+    df_sorted['porcentaje_trab_acum'] = df_sorted['trabajadores_acum'] / total_trabajadores * 100
+    df_sorted['empresa_num'] = range(1, len(df_sorted) + 1)
+    df_sorted['porcentaje_empresas'] = df_sorted['empresa_num'] / total_empresas * 100
+    return df_sorted
+
+
+def separar_tiers(df_sorted):
+    # Un solo groupby reparte tier1/2/3 conservando el orden desc de df_sorted
+    grupos = dict(tuple(df_sorted.groupby(tier_categorical(df_sorted['NroTrab_num']), observed=True, sort=False)))
+    tier1, tier2, tier3 = (grupos.get(name, df_sorted.iloc[:0]) for name in TIER_FILES)
+    print(f"\n   Tier 1 (>=1000 trab): {len(tier1):,} empresas")
+    print(f"   Tier 2 (500-999 trab): {len(tier2):,} empresas")
+    print(f"   Tier 3 (100-499 trab): {len(tier3):,} empresas")
+    
+    # Combinados para scraping prioritario
+    df_prioridad = pd.concat([tier1, tier2, tier3])
+    print(f"\n   TOTAL PRIORIDAD (>=100 trab): {len(df_prioridad):,} empresas")
+    return tier1, tier2, tier3, df_prioridad
+
+
+def guardar_tiers(tier1, tier2, tier3, df_prioridad):
+    # Prioridad para scraping
+    df_prioridad.to_parquet(DATA_DIR / "ruc_prioridad_scraping.parquet", index=False)
+    df_prioridad.to_csv(DATA_DIR / "ruc_prioridad_scraping.csv", index=False)
+    print(f"   Guardado: ruc_prioridad_scraping.parquet/csv ({len(df_prioridad):,} registros)")
+    
+    # Tiers individuales
+    for tier, nombre in zip((tier1, tier2, tier3), TIER_FILES.values()):
+        tier.to_parquet(DATA_DIR / f"{nombre}.parquet", index=False)
+        tier.to_csv(DATA_DIR / f"{nombre}.csv", index=False)
+        print(f"   Guardado: {nombre}.parquet/csv ({len(tier):,} registros)")
+
+
+def solo_tiers():
+    """
+    Tier 1-3 sin cargar el padrón: los totales salen de la columna NroTrab
+    (NroTrab_num > 0 descarta sin_dato) y las filas solo de Estado=ACTIVO/tier1..3.
+    Como tier1-3 son el prefijo del ranking, los acumulados coinciden con el
+    análisis completo.
+    """
     print("=" * 70)
-    print("ANÁLISIS PARETO - PADRÓN RUC PERSONAS JURÍDICAS")
+    print("TIERS PRIORIDAD - DATASET PARTICIONADO")
     print("=" * 70)
     
-    # 1. Leer archivo Parquet
-    print("\n1. Leyendo archivo Parquet...")
-    df = pd.read_parquet(INPUT_FILE)
-    print(f"   Total personas jurídicas: {len(df):,}")
-    print(f"   Columnas: {list(df.columns)}")
+    dataset = open_dataset(DATASET_DIR)
+    nro = dataset.to_table(columns=['NroTrab_num'], filter=ACTIVO & (ds.field('NroTrab_num') > 0))['NroTrab_num']
+    total_empresas = len(nro)
+    total_trabajadores = float(pc.sum(nro).as_py() or 0)
+    print(f"\n   Empresas con trabajadores: {total_empresas:,}")
+    print(f"   Total trabajadores: {total_trabajadores:,.0f}")
     
-    # 2. Análisis de Estado y Condición
-    print("\n2. Análisis de Estado:")
-    print(df['Estado'].value_counts())
+    df = a_historico(dataset.to_table(filter=ACTIVO & ds.field('tier').isin(list(TIER_FILES))))
+    # float como en el análisis completo (allí hay NaN)
+    df['NroTrab_num'] = pd.to_numeric(df['NroTrab'], errors='coerce').astype('float64')
+    df['Tamano'] = clasificar_tamano(df['NroTrab_num'])
+    df_sorted = acumulados(
+        df.iloc[order_desc(df['NroTrab_num'])].reset_index(drop=True),
+        total_trabajadores, total_empresas,
+    )
+    
+    tier1, tier2, tier3, df_prioridad = separar_tiers(df_sorted)
+    print("\nGuardando datasets...")
+    guardar_tiers(tier1, tier2, tier3, df_prioridad)
+    print("\n✅ Tiers generados!")
+
+
+def main():
+    print("=" * 70)
+    print("ANÁLISIS PARETO - PADRÓN RUC PERSONAS JURÍDICAS")
+    print("=" * 70)
     
-    # 3. Filtrar solo ACTIVAS
-    print("\n3. Filtrando solo empresas ACTIVAS...")
-    df_activas = df[df['Estado'] == 'ACTIVO'].copy()
-    print(f"   Empresas activas: {len(df_activas):,}")
+    if DATASET_DIR.exists():
+        # 1-3. Dataset particionado: conteos por metadata, solo se leen las activas
+        print(f"\n1. Leyendo dataset particionado {DATASET_DIR}...")
+        dataset = open_dataset(DATASET_DIR)
+        estados = contar_por_estado(dataset)
+        total_juridicas = int(estados.sum())
+        print(f"   Total personas jurídicas: {total_juridicas:,}")
+        print(f"   Columnas: {COLUMNS}")
+        
+        print("\n2. Análisis de Estado:")
+        print(estados)
+        
+        print("\n3. Filtrando solo empresas ACTIVAS...")
+        df_activas = a_historico(dataset.to_table(filter=ACTIVO))
+        print(f"   Empresas activas: {len(df_activas):,}")
+    else:
+        # 1. Leer archivo Parquet
+        print("\n1. Leyendo archivo Parquet...")
+        df = pd.read_parquet(INPUT_FILE)
+        total_juridicas = len(df)
+        print(f"   Total personas jurídicas: {len(df):,}")
+        print(f"   Columnas: {list(df.columns)}")
+        
+        # 2. Análisis de Estado y Condición
+        print("\n2. Análisis de Estado:")
+        print(df['Estado'].value_counts())
+        
+        # 3. Filtrar solo ACTIVAS
+        print("\n3. Filtrando solo empresas ACTIVAS...")
+        df_activas = df[df['Estado'] == 'ACTIVO'].copy()
+        del df
+        print(f"   Empresas activas: {len(df_activas):,}")
     
     # 4. Análisis de tipos de empresa
     print("\n4. Tipos de empresa:")
@@ -58,32 +196,22 @@ def main():
     
     # 6. Segmentación por tamaño
     print("\n6. Segmentación por tamaño de empresa:")
-    
-    def clasificar_tamano(x):
-        if pd.isna(x): return 'Sin dato'
-        if x >= 1000: return 'Gran empresa (>=1000)'
-        if x >= 500: return 'Grande (500-999)'
-        if x >= 100: return 'Mediana (100-499)'
-        if x >= 50: return 'Pequeña (50-99)'
-        if x >= 10: return 'Micro-mediana (10-49)'
-        return 'Micro (<10)'
-    
-    df_con_trab['Tamano'] = df_con_trab['NroTrab_num'].apply(clasificar_tamano)
+    df_con_trab['Tamano'] = clasificar_tamano(df_con_trab['NroTrab_num'])
     print(df_con_trab['Tamano'].value_counts())
     
     # 7. Aplicar Pareto
     print("\n7. APLICANDO PARETO 20/80...")
-    df_sorted = df_con_trab.sort_values('NroTrab_num', ascending=False).reset_index(drop=True)
+    # Histograma de NroTrab: orden por counting sort, sin ordenar la tabla por comparación
+    hist = ParetoHistogram()
+    hist.update(df_con_trab['NroTrab_num'])
+    df_sorted = df_con_trab.iloc[hist.order_desc(df_con_trab['NroTrab_num'])].reset_index(drop=True)
     
     # Calcular acumulados
     total_trabajadores = df_sorted['NroTrab_num'].sum()
-    df_sorted['trabajadores_acum'] = df_sorted['NroTrab_num'].cumsum()
-    df_sorted['porcentaje_trab_acum'] = df_sorted['trabajadores_acum'] / total_trabajadores * 100
-    df_sorted['empresa_num'] = range(1, len(df_sorted) + 1)
-    df_sorted['porcentaje_empresas'] = df_sorted['empresa_num'] / len(df_sorted) * 100
+    df_sorted = acumulados(df_sorted, total_trabajadores, len(df_sorted))
     
-    # Encontrar punto Pareto
-    pareto_80 = df_sorted[df_sorted['porcentaje_trab_acum'] <= 80]
+    # Encontrar punto Pareto (prefijo con porcentaje_trab_acum <= 80, desde el histograma)
+    pareto_80 = df_sorted.iloc[:hist.pareto_count(80)]
     pareto_empresas_pct = len(pareto_80) / len(df_sorted) * 100
     
     print(f"\n   Total empresas con trabajadores: {len(df_sorted):,}")
@@ -93,21 +221,7 @@ def main():
     # 8. Crear datasets priorizados
     print("\n8. Creando datasets priorizados...")
     
-    # Tier 1: Empresas MEGA (>=1000 trabajadores)
-    tier1 = df_sorted[df_sorted['NroTrab_num'] >= 1000].copy()
-    print(f"\n   Tier 1 (>=1000 trab): {len(tier1):,} empresas")
-    
-    # Tier 2: Empresas Grandes (500-999)
-    tier2 = df_sorted[(df_sorted['NroTrab_num'] >= 500) & (df_sorted['NroTrab_num'] < 1000)].copy()
-    print(f"   Tier 2 (500-999 trab): {len(tier2):,} empresas")
-    
-    # Tier 3: Empresas Medianas (100-499)
-    tier3 = df_sorted[(df_sorted['NroTrab_num'] >= 100) & (df_sorted['NroTrab_num'] < 500)].copy()
-    print(f"   Tier 3 (100-499 trab): {len(tier3):,} empresas")
-    
-    # Combinados para scraping prioritario
-    df_prioridad = pd.concat([tier1, tier2, tier3])
-    print(f"\n   TOTAL PRIORIDAD (>=100 trab): {len(df_prioridad):,} empresas")
+    tier1, tier2, tier3, df_prioridad = separar_tiers(df_sorted)
     
     # 9. Guardar datasets
     print("\n9. Guardando datasets...")
@@ -124,23 +238,7 @@ def main():
     pareto_80.to_parquet(DATA_DIR / "ruc_pareto_80.parquet", index=False)
     print(f"   Guardado: ruc_pareto_80.parquet ({len(pareto_80):,} registros)")
     
-    # Prioridad para scraping
-    df_prioridad.to_parquet(DATA_DIR / "ruc_prioridad_scraping.parquet", index=False)
-    df_prioridad.to_csv(DATA_DIR / "ruc_prioridad_scraping.csv", index=False)
-    print(f"   Guardado: ruc_prioridad_scraping.parquet/csv ({len(df_prioridad):,} registros)")
-    
-    # Tiers individuales
-    tier1.to_parquet(DATA_DIR / "tier1_mega.parquet", index=False)
-    tier2.to_parquet(DATA_DIR / "tier2_grandes.parquet", index=False)
-    tier3.to_parquet(DATA_DIR / "tier3_medianas.parquet", index=False)
-    
-    tier1.to_csv(DATA_DIR / "tier1_mega.csv", index=False)
-    tier2.to_csv(DATA_DIR / "tier2_grandes.csv", index=False)
-    tier3.to_csv(DATA_DIR / "tier3_medianas.csv", index=False)
-    
-    print(f"   Guardado: tier1_mega.parquet/csv ({len(tier1):,} registros)")
-    print(f"   Guardado: tier2_grandes.parquet/csv ({len(tier2):,} registros)")
-    print(f"   Guardado: tier3_medianas.parquet/csv ({len(tier3):,} registros)")
+    guardar_tiers(tier1, tier2, tier3, df_prioridad)
     
     # 10. Mostrar TOP empresas
     print("\n" + "=" * 70)
@@ -170,7 +268,7 @@ def main():
     print("=" * 70)
     
     resumen = {
-        "total_personas_juridicas": int(len(df)),
+        "total_personas_juridicas": int(total_juridicas),
         "total_activas": int(len(df_activas)),
         "con_trabajadores": int(len(df_con_trab)),
         "pareto_80_empresas": int(len(pareto_80)),
@@ -196,4 +294,12 @@ def main():
     print(f"   Archivos guardados en: {DATA_DIR}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Pareto 20/80 y tiers de prioridad del padrón RUC")
+    parser.add_argument("--solo-tiers", action="store_true",
+                        help="Solo tier1-3 y prioridad, leyendo particiones del dataset")
+    args = parser.parse_args()
+
+    if args.solo_tiers:
+        solo_tiers()
+    else:
+        main()
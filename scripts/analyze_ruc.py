@@ -4,136 +4,172 @@ Script para analizar el padrón RUC y preparar datos para Empliq
 - Filtrar personas jurídicas (RUC empieza con 2)
 - Aplicar Pareto (20% empresas más grandes = 80% del impacto)
 - Convertir a Parquet
+
+Memoria acotada (corre en el worker de 8GB): el padrón se procesa en lotes,
+los Parquet se escriben lote a lote y el Pareto sale de un histograma de
+NroTrab (padron_pareto.py). Solo las filas que entran en alguna salida
+ordenada (top 20% o >= 100 trab) se releen y ordenan con counting sort.
 """
 
+from collections import Counter
+from pathlib import Path
+
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
-from pathlib import Path
+
+from padron import OUT_DIR, PADRON, iter_batches, read_header
+from padron_pareto import ParetoHistogram, TopN
 
 # Configuración
-INPUT_FILE = Path("/home/jimmy/Descargas/PadronRUC_202601.csv")
-OUTPUT_DIR = Path("/home/jimmy/sueldos-organigrama/data")
+INPUT_FILE = PADRON
+OUTPUT_DIR = OUT_DIR
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+CHUNK_SIZE = 200_000  # activas por lote
+
+
+class ParquetChunks:
+    """ParquetWriter con schema fijo para escribir DataFrames lote a lote."""
+
+    def __init__(self, path: Path, schema: pa.Schema):
+        self.path = path
+        self.schema = schema
+        self.writer = pq.ParquetWriter(path, schema)
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        self.writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+        self.rows += len(df)
+
+    def close(self):
+        self.writer.close()
+
+
 def main():
     print("=" * 60)
     print("ANÁLISIS DEL PADRÓN RUC PARA EMPLIQ")
     print("=" * 60)
-    
-    # 1. Leer archivo CSV
-    print("\n1. Leyendo archivo CSV...")
-    df = pd.read_csv(
-        INPUT_FILE,
-        dtype=str,
-        encoding='utf-8',
-        on_bad_lines='skip',
-        low_memory=False
-    )
-    print(f"   Total registros: {len(df):,}")
-    print(f"   Columnas: {list(df.columns)}")
-    
-    # 2. Filtrar personas jurídicas (RUC empieza con 2)
-    print("\n2. Filtrando personas jurídicas...")
-    df_juridicas = df[df['RUC'].str.startswith('2', na=False)].copy()
-    print(f"   Personas jurídicas: {len(df_juridicas):,}")
-    
-    # 3. Filtrar solo ACTIVAS
-    print("\n3. Filtrando solo ACTIVAS...")
-    df_activas = df_juridicas[df_juridicas['Estado'] == 'ACTIVO'].copy()
-    print(f"   Activas: {len(df_activas):,}")
-    
-    # 4. Analizar NroTrab
+
+    header = read_header(INPUT_FILE)
+    str_fields = [pa.field(c, pa.string()) for c in header]
+    schema_activas = pa.schema(str_fields + [pa.field('NroTrab_num', pa.float64())])
+    schema_sorted = schema_activas.append(pa.field('trabajadores_acum', pa.float64())) \
+                                  .append(pa.field('porcentaje_acum', pa.float64()))
+
+    output_all = OUTPUT_DIR / "ruc_juridicas_activas.parquet"
+    output_trab = OUTPUT_DIR / "ruc_con_trabajadores.parquet"
+    output_pareto = OUTPUT_DIR / "ruc_pareto_top20.parquet"
+    output_prioridad = OUTPUT_DIR / "ruc_empresas_prioridad.parquet"
+    output_csv = OUTPUT_DIR / "ruc_empresas_prioridad.csv"
+
+    # 1-4. Pasada única en lotes: filtra, escribe activas/con_trab y arma el histograma
+    print("\n1. Leyendo padrón en lotes (solo jurídicas activas)...")
+    stats = Counter()
+    nro_trab_counts = Counter()   # value_counts de NroTrab (texto)
+    hist = ParetoHistogram()      # NroTrab_num → empresas (con trabajadores)
+    top50 = TopN(50)
+    n_activas = 0
+
+    activas = ParquetChunks(output_all, schema_activas)
+    con_trab = ParquetChunks(output_trab, schema_activas)
+
+    try:
+        for lote, batch in enumerate(iter_batches(INPUT_FILE, solo_activas=True, batch_size=CHUNK_SIZE, stats=stats), 1):
+            df = pd.DataFrame([r[:len(header)] for r in batch], columns=header).replace('', None)
+            df.index = pd.RangeIndex(n_activas, n_activas + len(df))
+            n_activas += len(df)
+
+            nro_trab_counts.update(df['NroTrab'].dropna())
+            df['NroTrab_num'] = pd.to_numeric(df['NroTrab'], errors='coerce')
+            activas.write(df)
+
+            df_con_trab = df[df['NroTrab_num'].notna() & (df['NroTrab_num'] > 0)]
+            con_trab.write(df_con_trab)
+
+            hist.update(df_con_trab['NroTrab_num'])
+            top50.push(df_con_trab['NroTrab_num'], df_con_trab.iloc)
+            print(f"   Lote {lote}: {n_activas:,} activas | {con_trab.rows:,} con trabajadores")
+    finally:
+        activas.close()
+        con_trab.close()
+
+    print(f"   Total registros: {stats['lineas']:,}")
+    print(f"   Columnas: {header}")
+    print(f"   Personas jurídicas: {stats['juridicas']:,}")
+    print(f"   Activas: {n_activas:,}")
+
     print("\n4. Analizando número de trabajadores...")
-    print(df_activas['NroTrab'].value_counts().head(20))
-    
-    # Convertir NroTrab a numérico (los que no tienen son "NO DISPONIBLE")
-    df_activas['NroTrab_num'] = pd.to_numeric(df_activas['NroTrab'], errors='coerce')
-    
-    # Empresas con trabajadores registrados
-    df_con_trab = df_activas[df_activas['NroTrab_num'].notna() & (df_activas['NroTrab_num'] > 0)].copy()
-    print(f"\n   Empresas con trabajadores registrados: {len(df_con_trab):,}")
-    
-    # Estadísticas de trabajadores
-    print(f"\n   Estadísticas de trabajadores:")
-    print(df_con_trab['NroTrab_num'].describe())
-    
-    # 5. Aplicar Pareto - top 20% de empresas por trabajadores
+    value_counts = pd.Series(nro_trab_counts, name='count', dtype='int64').sort_values(ascending=False, kind='stable')
+    value_counts.index.name = 'NroTrab'
+    print(value_counts.head(20))
+
+    n_con_trab = con_trab.rows
+    print(f"\n   Empresas con trabajadores registrados: {n_con_trab:,}")
+    if n_con_trab:
+        print(f"\n   Estadísticas de trabajadores:")
+        print(hist.describe())
+
+    # 5. Pareto: el histograma da el umbral; solo esas filas se releen y ordenan
     print("\n5. Aplicando Pareto (top 20% empresas más grandes)...")
-    df_sorted = df_con_trab.sort_values('NroTrab_num', ascending=False)
-    
-    # Calcular acumulado
-    total_trabajadores = df_sorted['NroTrab_num'].sum()
-    df_sorted['trabajadores_acum'] = df_sorted['NroTrab_num'].cumsum()
-    df_sorted['porcentaje_acum'] = df_sorted['trabajadores_acum'] / total_trabajadores * 100
-    
-    # Top 20% de empresas
-    top_20_count = int(len(df_sorted) * 0.20)
-    df_top20 = df_sorted.head(top_20_count)
-    
-    print(f"   Total empresas con trabajadores: {len(df_sorted):,}")
+    top_20_count = int(n_con_trab * 0.20)
+    total_trabajadores = float(hist.total)
+
+    umbral = 100
+    if top_20_count:
+        umbral = min(umbral, hist.value_at_rank(top_20_count - 1))
+    seleccion = pq.read_table(output_trab, filters=[('NroTrab_num', '>=', umbral)]).to_pandas()
+    ordenadas = seleccion.iloc[hist.order_desc(seleccion['NroTrab_num'])].reset_index(drop=True)
+    ordenadas['trabajadores_acum'] = ordenadas['NroTrab_num'].cumsum()
+    ordenadas['porcentaje_acum'] = ordenadas['trabajadores_acum'] / total_trabajadores * 100
+
+    df_pareto = ordenadas.iloc[:top_20_count]
+    df_prioridad = ordenadas[ordenadas['NroTrab_num'] >= 100]
+    cobertura_top20 = df_pareto['porcentaje_acum'].iloc[-1] if len(df_pareto) else 0.0
+    for df_out, path in ((df_pareto, output_pareto), (df_prioridad, output_prioridad)):
+        pq.write_table(pa.Table.from_pandas(df_out, schema=schema_sorted, preserve_index=False), path)
+    df_prioridad.to_csv(output_csv, index=False)
+
+    print(f"   Total empresas con trabajadores: {n_con_trab:,}")
     print(f"   Top 20% empresas: {top_20_count:,}")
-    print(f"   Trabajadores cubiertos por top 20%: {df_top20['porcentaje_acum'].iloc[-1]:.1f}%")
-    
+    print(f"   Trabajadores cubiertos por top 20%: {cobertura_top20:.1f}%")
+
     # 6. Diferentes niveles de empresas
     print("\n6. Segmentación de empresas:")
-    
-    # Grandes (>500 trabajadores)
-    grandes = df_sorted[df_sorted['NroTrab_num'] >= 500]
-    print(f"   Grandes (>=500 trab): {len(grandes):,}")
-    
-    # Medianas (100-499 trabajadores)  
-    medianas = df_sorted[(df_sorted['NroTrab_num'] >= 100) & (df_sorted['NroTrab_num'] < 500)]
-    print(f"   Medianas (100-499 trab): {len(medianas):,}")
-    
-    # Pequeñas (10-99 trabajadores)
-    pequenas = df_sorted[(df_sorted['NroTrab_num'] >= 10) & (df_sorted['NroTrab_num'] < 100)]
-    print(f"   Pequeñas (10-99 trab): {len(pequenas):,}")
-    
-    # 7. Guardar datasets
+    por_tamano = hist.size_counts()  # códigos de padron.size_codes
+    segmentos = {
+        'grandes': int(por_tamano[5:].sum()),     # >=500
+        'medianas': int(por_tamano[4]),          # 100-499
+        'pequenas': int(por_tamano[1:4].sum()),  # 10-99
+    }
+    print(f"   Grandes (>=500 trab): {segmentos['grandes']:,}")
+    print(f"   Medianas (100-499 trab): {segmentos['medianas']:,}")
+    print(f"   Pequeñas (10-99 trab): {segmentos['pequenas']:,}")
+
+    # 7. Datasets (ya escritos en streaming)
     print("\n7. Guardando datasets...")
-    
-    # Dataset completo de jurídicas activas
-    output_all = OUTPUT_DIR / "ruc_juridicas_activas.parquet"
-    df_activas.to_parquet(output_all, engine='pyarrow', index=False)
     print(f"   Guardado: {output_all}")
-    
-    # Dataset con trabajadores
-    output_trab = OUTPUT_DIR / "ruc_con_trabajadores.parquet"
-    df_con_trab.to_parquet(output_trab, engine='pyarrow', index=False)
     print(f"   Guardado: {output_trab}")
-    
-    # Top 20% (Pareto)
-    output_pareto = OUTPUT_DIR / "ruc_pareto_top20.parquet"
-    df_top20.to_parquet(output_pareto, engine='pyarrow', index=False)
     print(f"   Guardado: {output_pareto}")
-    
-    # Empresas grandes y medianas (para scrapear primero)
-    df_prioridad = df_sorted[df_sorted['NroTrab_num'] >= 100].copy()
-    output_prioridad = OUTPUT_DIR / "ruc_empresas_prioridad.parquet"
-    df_prioridad.to_parquet(output_prioridad, engine='pyarrow', index=False)
     print(f"   Guardado: {output_prioridad} ({len(df_prioridad):,} empresas)")
-    
-    # También exportar a CSV para revisión
-    output_csv = OUTPUT_DIR / "ruc_empresas_prioridad.csv"
-    df_prioridad.to_csv(output_csv, index=False)
     print(f"   Guardado: {output_csv}")
-    
+
     # 8. Resumen final
     print("\n" + "=" * 60)
     print("RESUMEN FINAL")
     print("=" * 60)
-    print(f"Total registros originales: {len(df):,}")
-    print(f"Personas jurídicas activas: {len(df_activas):,}")
-    print(f"Con trabajadores registrados: {len(df_con_trab):,}")
+    print(f"Total registros originales: {stats['lineas']:,}")
+    print(f"Personas jurídicas activas: {n_activas:,}")
+    print(f"Con trabajadores registrados: {n_con_trab:,}")
     print(f"Empresas prioridad (>=100 trab): {len(df_prioridad):,}")
     print(f"Top 20% Pareto: {top_20_count:,}")
-    
+
     # Mostrar top 50 empresas por trabajadores
     print("\n" + "=" * 60)
     print("TOP 50 EMPRESAS POR NÚMERO DE TRABAJADORES")
     print("=" * 60)
-    top50 = df_sorted.head(50)[['RUC', 'NroTrab_num', 'Actividad_Economica_CIIU_revision3_Principal', 'Departamento']]
+    # Índice = posición entre las activas (como df.index de cada lote)
+    top50 = pd.DataFrame(top50.rows(), columns=['RUC', 'NroTrab_num', 'Actividad_Economica_CIIU_revision3_Principal', 'Departamento'])
     print(top50.to_string())
 
 if __name__ == "__main__":
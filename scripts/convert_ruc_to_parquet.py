@@ -1,101 +1,50 @@
 #!/usr/bin/env python3
 """
 Script para convertir el padrón RUC a Parquet en chunks
-- Procesa archivo de 3.2GB en chunks manejables
+- Procesa archivo de 3.2GB en streaming (lector compartido padron.py)
 - Filtra solo personas jurídicas (RUC empieza con 2)
 - Guarda en formato Parquet comprimido
+
+Uso:
+    python3 convert_ruc_to_parquet.py                      # todo string, snappy (formato histórico)
+    python3 convert_ruc_to_parquet.py --typed --compression zstd --row-group-size 131072
+      → RUC int64, NroTrab int32 nullable, categóricas dictionary-encoded
+    python3 convert_ruc_to_parquet.py --dataset
+      → además padron_ruc_juridicas/Estado=.../tier=.../ (Hive, orden NroTrab desc)
 """
 
-import pandas as pd
-import pyarrow as pa
-import pyarrow.parquet as pq
-from pathlib import Path
+import argparse
 import os
 
+from padron import OUT_DIR, PADRON, DatasetSink, ParquetSink, scan
+
 # Configuración
-INPUT_FILE = Path("/home/jimmy/Descargas/PadronRUC_202601.csv")
-OUTPUT_DIR = Path("/home/jimmy/sueldos-organigrama/data")
+INPUT_FILE = PADRON
+OUTPUT_DIR = OUT_DIR
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-CHUNK_SIZE = 500_000  # 500k registros por chunk
+CHUNK_SIZE = 500_000  # 500k registros por lote
 
-def convert_to_parquet():
+def convert_to_parquet(typed: bool = False, compression: str = 'snappy',
+                       compression_level: int | None = None, row_group_size: int | None = None,
+                       dataset: bool = False):
     print("=" * 60)
     print("CONVERSIÓN CSV A PARQUET - PADRÓN RUC")
     print("=" * 60)
     
     output_file = OUTPUT_DIR / "padron_ruc_juridicas.parquet"
+    output_dataset = OUTPUT_DIR / "padron_ruc_juridicas"
     
-    # Schema para PyArrow
-    schema = pa.schema([
-        ('RUC', pa.string()),
-        ('Estado', pa.string()),
-        ('Condicion', pa.string()),
-        ('Tipo', pa.string()),
-        ('Actividad_CIIU3_Principal', pa.string()),
-        ('Actividad_CIIU3_Secundaria', pa.string()),
-        ('Actividad_CIIU4_Principal', pa.string()),
-        ('NroTrab', pa.string()),
-        ('TipoFacturacion', pa.string()),
-        ('TipoContabilidad', pa.string()),
-        ('ComercioExterior', pa.string()),
-        ('UBIGEO', pa.string()),
-        ('Departamento', pa.string()),
-        ('Provincia', pa.string()),
-        ('Distrito', pa.string()),
-        ('PERIODO_PUBLICACION', pa.string()),
-    ])
-    
-    # Nombres de columnas para mapear
-    col_names = [
-        'RUC', 'Estado', 'Condicion', 'Tipo',
-        'Actividad_CIIU3_Principal', 'Actividad_CIIU3_Secundaria',
-        'Actividad_CIIU4_Principal', 'NroTrab', 'TipoFacturacion',
-        'TipoContabilidad', 'ComercioExterior', 'UBIGEO',
-        'Departamento', 'Provincia', 'Distrito', 'PERIODO_PUBLICACION'
-    ]
-    
-    writer = None
-    total_rows = 0
-    juridicas_rows = 0
-    chunk_num = 0
+    print(f"\nLeyendo archivo en lotes de {CHUNK_SIZE:,} registros...")
+    print(f"Filtrando solo personas jurídicas (RUC empieza con 2)...")
+    print(f"Schema: {'tipado + dictionary' if typed else 'string'} | compresión: {compression}\n")
     
-    print(f"\nLeyendo archivo en chunks de {CHUNK_SIZE:,} registros...")
-    print(f"Filtrando solo personas jurídicas (RUC empieza con 2)...\n")
-    
-    try:
-        for chunk in pd.read_csv(
-            INPUT_FILE,
-            dtype=str,
-            encoding='latin-1',  # Archivo tiene tildes y Ñ
-            on_bad_lines='skip',
-            chunksize=CHUNK_SIZE,
-            low_memory=False
-        ):
-            chunk_num += 1
-            total_rows += len(chunk)
-            
-            # Renombrar columnas
-            chunk.columns = col_names
-            
-            # Filtrar solo personas jurídicas (RUC empieza con 2)
-            chunk_juridicas = chunk[chunk['RUC'].str.startswith('2', na=False)].copy()
-            juridicas_rows += len(chunk_juridicas)
-            
-            if len(chunk_juridicas) > 0:
-                # Convertir a PyArrow Table
-                table = pa.Table.from_pandas(chunk_juridicas, schema=schema, preserve_index=False)
-                
-                if writer is None:
-                    writer = pq.ParquetWriter(output_file, schema, compression='snappy')
-                
-                writer.write_table(table)
-            
-            print(f"  Chunk {chunk_num}: {total_rows:,} procesados | {juridicas_rows:,} jurídicas")
-    
-    finally:
-        if writer:
-            writer.close()
+    sink = ParquetSink(output_file, compression=compression, typed=typed,
+                       row_group_size=row_group_size, compression_level=compression_level)
+    consumers = [sink]
+    if dataset:
+        consumers.append(DatasetSink(output_dataset, compression='zstd' if compression == 'none' else compression))
+    stats = scan(INPUT_FILE, consumers, batch_size=CHUNK_SIZE)
     
     # Verificar archivo creado
     file_size = os.path.getsize(output_file) / (1024 * 1024)  # MB
@@ -103,12 +52,35 @@ def convert_to_parquet():
     print("\n" + "=" * 60)
     print("CONVERSIÓN COMPLETADA")
     print("=" * 60)
-    print(f"Total registros procesados: {total_rows:,}")
-    print(f"Personas jurídicas guardadas: {juridicas_rows:,}")
+    print(f"Total registros procesados: {stats['lineas']:,}")
+    print(f"Personas jurídicas guardadas: {sink.rows:,}")
+    if sink.ruc_invalidos:
+        print(f"RUC no numérico (guardados como null): {sink.ruc_invalidos:,}")
     print(f"Archivo de salida: {output_file}")
     print(f"Tamaño: {file_size:.1f} MB")
+    if dataset:
+        print(f"Dataset particionado: {output_dataset}")
     
     return output_file
 
 if __name__ == "__main__":
-    convert_to_parquet()
+    parser = argparse.ArgumentParser(description="Padrón RUC (CSV) → Parquet de personas jurídicas")
+    parser.add_argument("--typed", action="store_true",
+                        help="RUC int64, NroTrab int32, categóricas dictionary-encoded")
+    parser.add_argument("--compression", default="snappy", choices=["snappy", "zstd", "gzip", "none"],
+                        help="Códec Parquet (default: snappy)")
+    parser.add_argument("--compression-level", type=int, default=None,
+                        help="Nivel del códec (ej. zstd 1-22)")
+    parser.add_argument("--row-group-size", type=int, default=None,
+                        help="Filas por row group (default: un row group por lote)")
+    parser.add_argument("--dataset", action="store_true",
+                        help="Escribe también el dataset particionado por Estado/tier")
+    args = parser.parse_args()
+
+    convert_to_parquet(
+        typed=args.typed,
+        compression=args.compression,
+        compression_level=args.compression_level,
+        row_group_size=args.row_group_size,
+        dataset=args.dataset,
+    )
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Shared pixel kernels for the illustration scripts (process_images.py,
+split_avatars.py): white/light background → alpha, plus the trim box.
+
+The new alpha of a background pixel only depends on r+g+b (0..765), so the
+ramp is precomputed once per (threshold, band) as a 766-entry uint8 table.
+One pass over the image, in strips of STRIP_ROWS rows, then needs only
+uint8/uint16 temporaries per strip (channel sum, min channel, gate) and
+collects the rows/cols with content for the bounding box at the same time.
+Pixels are read strip by strip (no full-size array copy); besides the
+alpha plane, the only full-size allocation is the cropped RGBA result.
+
+    out = remove_background(img, threshold=232, band=40, padding=5)   # remove + trim
+    out = remove_background(img, threshold=238, band=30, light=True)  # grayscale art
+    alpha, bbox = background_alpha(img, threshold=232, band=40)
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+STRIP_ROWS = 256
+CONTENT_ALPHA = 10  # alpha > 10 counts as content when trimming
+
+
+@lru_cache(maxsize=None)
+def white_ramp(threshold: int, band: int) -> np.ndarray:
+    """Alpha by r+g+b for near-white pixels: opaque at threshold - band, 0 from threshold up."""
+    avg = np.arange(766) / 3
+    return (np.clip(1.0 - (avg - (threshold - band)) / band, 0, 1) * 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def light_ramp(threshold: int, band: int) -> np.ndarray:
+    """Alpha by r+g+b for light pixels (by mean brightness), same ends as white_ramp."""
+    avg = np.arange(766) / 3
+    return np.clip((threshold - avg) / band * 255, 0, 255).astype(np.uint8)
+
+
+def _rgb(img: Image.Image) -> Image.Image:
+    return img if img.mode in ("RGB", "RGBA") else img.convert("RGBA")
+
+
+def _bbox(rows: np.ndarray, cols: np.ndarray) -> tuple[int, int, int, int] | None:
+    if not rows.any() or not cols.any():
+        return None
+    top = int(np.argmax(rows))
+    bottom = len(rows) - int(np.argmax(rows[::-1]))
+    left = int(np.argmax(cols))
+    right = len(cols) - int(np.argmax(cols[::-1]))
+    return left, top, right, bottom
+
+
+def _pad(bbox: tuple, size: tuple[int, int], padding: int) -> tuple[int, int, int, int]:
+    left, top, right, bottom = bbox
+    width, height = size
+    return max(0, left - padding), max(0, top - padding), min(width, right + padding), min(height, bottom + padding)
+
+
+def background_alpha(img: Image.Image, threshold: int, band: int,
+                     light: bool = False) -> tuple[np.ndarray, tuple[int, int, int, int] | None]:
+    """
+    New alpha plane (uint8, H x W) and content bounding box (alpha > 10,
+    unpadded; None if empty). Pixels with every channel >= threshold - band
+    (light=True: mean >= threshold - band) get their alpha from the ramp,
+    which is 0 from threshold up; all other pixels keep their alpha.
+    """
+    img = _rgb(img)
+    w, h = img.size
+    if img.mode == "RGBA":
+        alpha = np.array(img.getchannel("A"))
+    else:
+        alpha = np.full((h, w), 255, dtype=np.uint8)
+    ramp = (light_ramp if light else white_ramp)(threshold, band)
+    lo = max(threshold - band, 0)
+
+    rows = np.zeros(h, dtype=bool)
+    cols = np.zeros(w, dtype=bool)
+    for y in range(0, h, STRIP_ROWS):
+        strip = np.asarray(img.crop((0, y, w, min(y + STRIP_ROWS, h))))
+        r, g, b = strip[:, :, 0], strip[:, :, 1], strip[:, :, 2]
+        total = r.astype(np.uint16)
+        total += g
+        total += b
+        if light:
+            gate = total >= 3 * lo
+        else:
+            low = np.minimum(r, g)
+            np.minimum(low, b, out=low)
+            gate = low >= lo
+        a = alpha[y:y + STRIP_ROWS]
+        np.copyto(a, ramp[total], where=gate)
+        content = a > CONTENT_ALPHA
+        rows[y:y + STRIP_ROWS] = content.any(axis=1)
+        cols |= content.any(axis=0)
+
+    return alpha, _bbox(rows, cols)
+
+
+def remove_background(img: Image.Image, threshold: int, band: int, padding: int | None = None,
+                      light: bool = False) -> Image.Image:
+    """
+    RGBA copy of img with the white (or light) background made transparent.
+    With padding, it is also trimmed to its content + padding (the whole
+    image if nothing is left), like trim() but without a second pass.
+    """
+    img = _rgb(img)
+    alpha, bbox = background_alpha(img, threshold, band, light)
+    box = (0, 0) + img.size
+    if padding is not None and bbox is not None:
+        box = _pad(bbox, img.size, padding)
+    left, top, right, bottom = box
+
+    # Copy only the kept box, strip by strip, straight into the RGBA buffer
+    out = np.empty((bottom - top, right - left, 4), dtype=np.uint8)
+    for y in range(top, bottom, STRIP_ROWS):
+        y_end = min(y + STRIP_ROWS, bottom)
+        out[y - top:y_end - top, :, :3] = np.asarray(img.crop((left, y, right, y_end)))[:, :, :3]
+    out[:, :, 3] = alpha[top:bottom, left:right]
+    return Image.fromarray(out)
+
+
+def trim(img: Image.Image, padding: int = 8) -> Image.Image:
+    """Crop transparent areas around content (alpha > 10), keeping padding."""
+    if img.mode != "RGBA":
+        return img
+    alpha = np.asarray(img.getchannel("A"))
+    content = alpha > CONTENT_ALPHA
+    bbox = _bbox(content.any(axis=1), content.any(axis=0))
+    if bbox is None:
+        return img
+    return img.crop(_pad(bbox, img.size, padding))
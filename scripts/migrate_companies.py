@@ -33,23 +33,32 @@ Uso:
   python3 migrate_companies.py --limit=100           # primeras 100 empresas
   python3 migrate_companies.py --dry-run             # preview, sin escritura
   python3 migrate_companies.py --update-logos        # solo actualizar logos
+  python3 migrate_companies.py --sync                # actualizar empresas cuyo data cambió
   python3 migrate_companies.py --stats               # mostrar estadísticas
+  python3 migrate_companies.py --bulk                # COPY + INSERT ... SELECT por lotes
+  python3 migrate_companies.py --workers=4 --bulk    # 4 workers en paralelo (shards por RUC)
+  python3 migrate_companies.py --transform-workers=2 # transformar filas en 2 procesos aparte
 
 Dependencias:
-  pip install psycopg2-binary
+  pip install psycopg2-binary numpy
+  pip install orjson                                 # opcional, metadata JSON más rápida
 """
 
 import argparse
-import json
+import io
 import os
-import re
 import subprocess
 import sys
-import uuid
-from datetime import datetime
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+
+from migration_transform import TransformPool, company_name, transform_batch
+from rucset import RucSet
+from slugs import generate_slugs
 
 # ============================================
 # Configuration
@@ -80,30 +89,19 @@ ORACLE_TARGET_DB_PORT = int(os.getenv("ORACLE_TARGET_DB_PORT", "5432"))
 ORACLE_SOURCE_DB_HOST = os.getenv("ORACLE_SOURCE_DB_HOST", "musuq-postgres")
 
 BATCH_SIZE = 500
+BULK_BATCH_SIZE = 5000  # companies per COPY + INSERT ... SELECT round in --bulk
+FETCH_SIZE = 2000  # source rows per server-side cursor round trip
 
 
 # ============================================
 # Helpers
 # ============================================
-def generate_slug(name: str) -> str:
-    """Generate URL-safe slug from company name."""
-    slug = name.lower().strip()
-    replacements = {
-        "áàäâ": "a", "éèëê": "e", "íìïî": "i",
-        "óòöô": "o", "úùüû": "u", "ñ": "n",
-    }
-    for chars, repl in replacements.items():
-        for c in chars:
-            slug = slug.replace(c, repl)
-    slug = re.sub(r"[^a-z0-9]+", "-", slug)
-    slug = slug.strip("-")
-    return slug
-
-
-def connect_oracle_via_ssh():
-    """Create SSH tunnel to Oracle server and return (tunnel_process, connection).
-    
+def open_ssh_tunnel() -> tuple[subprocess.Popen, int]:
+    """Start an SSH tunnel to Oracle's Postgres and return (tunnel_process, local_port).
+
     Uses subprocess SSH tunnel instead of paramiko for Python 3.14 compatibility.
+    ExitOnForwardFailure makes ssh die (instead of idling) if the forward can't
+    be set up, so a broken tunnel is reported right away.
     """
     import time
     import socket
@@ -120,145 +118,253 @@ def connect_oracle_via_ssh():
         "-o", "StrictHostKeyChecking=no",
         "-o", "BatchMode=yes",
         "-o", "ConnectTimeout=10",
+        "-o", "ExitOnForwardFailure=yes",
+        "-o", "ServerAliveInterval=30",
         f"{ORACLE_SSH_USER}@{ORACLE_HOST}",
     ]
     tunnel_proc = subprocess.Popen(tunnel_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
-    # Wait for tunnel to be ready
-    for attempt in range(20):
-        time.sleep(0.5)
+    # Wait for tunnel to be ready (poll every 50ms, up to 10s)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
                 s.settimeout(1)
                 s.connect(("127.0.0.1", local_port))
-                break
+                return tunnel_proc, local_port
         except (ConnectionRefusedError, OSError):
             if tunnel_proc.poll() is not None:
                 stderr = tunnel_proc.stderr.read().decode()
                 raise ConnectionError(f"SSH tunnel died: {stderr}")
-    else:
-        tunnel_proc.terminate()
-        raise ConnectionError("SSH tunnel timeout after 10s")
-
-    conn = psycopg2.connect(
-        host="127.0.0.1",
-        port=local_port,
-        dbname=ORACLE_DB_NAME,
-        user=ORACLE_DB_USER,
-        password=ORACLE_DB_PASS,
-        connect_timeout=10,
-    )
-    return tunnel_proc, conn
-
+            time.sleep(0.05)
 
-def connect_local(db_name: str):
-    """Connect to local Docker PostgreSQL."""
-    return psycopg2.connect(
-        host=LOCAL_DB_HOST,
-        port=LOCAL_DB_PORT,
-        dbname=db_name,
-        user=LOCAL_DB_USER,
-        password=LOCAL_DB_PASS,
-    )
+    tunnel_proc.terminate()
+    raise ConnectionError("SSH tunnel timeout after 10s")
 
 
-def connect_oracle_source_direct():
-    """Connect to source DB (musuq-postgres) on same Docker network.
-    Used in --mode=oracle when running on the Oracle server itself.
+class ConnectionManager:
     """
-    return psycopg2.connect(
-        host=ORACLE_SOURCE_DB_HOST,
-        port=ORACLE_PG_PORT,
-        dbname=ORACLE_DB_NAME,
-        user=ORACLE_DB_USER,
-        password=ORACLE_DB_PASS,
-        connect_timeout=10,
-    )
-
+    Owns the SSH tunnel (--mode=local) and one connection pool per target
+    database, so every subcommand reuses connections instead of paying
+    TCP + auth (+ tunnel) again.
 
-def connect_oracle_target(db_name: str):
-    """Connect to target DB (empliq_prod/empliq_pre_prod) on musuq-postgres.
-    Same PostgreSQL container, different database. Used in --mode=oracle.
+    --mode=local   source through the SSH tunnel, targets on local Docker PG
+    --mode=oracle  source and targets on musuq-postgres (Docker network)
     """
-    return psycopg2.connect(
-        host=ORACLE_TARGET_DB_HOST,
-        port=ORACLE_TARGET_DB_PORT,
-        dbname=db_name,
-        user=ORACLE_TARGET_DB_USER,
-        password=ORACLE_TARGET_DB_PASS,
-        connect_timeout=10,
-    )
+
+    def __init__(self, mode: str, maxconn: int = 4):
+        self.mode = mode
+        self.maxconn = maxconn
+        self.tunnel = None
+        self.pools = {}
+        self._borrowed = {}  # id(conn) → db_name
+        self._source_conn = None
+
+        if mode == "oracle":
+            source_host, source_port = ORACLE_SOURCE_DB_HOST, ORACLE_PG_PORT
+            self._target = {
+                "host": ORACLE_TARGET_DB_HOST,
+                "port": ORACLE_TARGET_DB_PORT,
+                "user": ORACLE_TARGET_DB_USER,
+                "password": ORACLE_TARGET_DB_PASS,
+                "connect_timeout": 10,
+            }
+        else:
+            self.tunnel, source_port = open_ssh_tunnel()
+            source_host = "127.0.0.1"
+            self._target = {
+                "host": LOCAL_DB_HOST,
+                "port": LOCAL_DB_PORT,
+                "user": LOCAL_DB_USER,
+                "password": LOCAL_DB_PASS,
+            }
+        self._source = {
+            "host": source_host,
+            "port": source_port,
+            "dbname": ORACLE_DB_NAME,
+            "user": ORACLE_DB_USER,
+            "password": ORACLE_DB_PASS,
+            "connect_timeout": 10,
+        }
+
+    def source_params(self) -> dict:
+        """Connection kwargs for the source (e.g. for worker processes)."""
+        return dict(self._source)
+
+    def target_params(self, db_name: str) -> dict:
+        return {**self._target, "dbname": db_name}
+
+    def source(self):
+        """The source connection, opened once and shared by every subcommand."""
+        if self._source_conn is None or self._source_conn.closed:
+            self._source_conn = psycopg2.connect(**self._source)
+        return self._source_conn
+
+    def target(self, db_name: str):
+        """Borrow a pooled connection to a target DB; give it back with release()."""
+        if db_name not in self.pools:
+            self.pools[db_name] = psycopg2.pool.SimpleConnectionPool(0, self.maxconn, **self.target_params(db_name))
+        conn = self.pools[db_name].getconn()
+        self._borrowed[id(conn)] = db_name
+        return conn
+
+    def release(self, conn):
+        """Return a target connection to its pool (rolled back if a transaction is open)."""
+        if not conn.closed:
+            conn.rollback()
+        self.pools[self._borrowed.pop(id(conn))].putconn(conn)
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.closeall()
+        if self._source_conn is not None:
+            self._source_conn.close()
+        if self.tunnel:
+            self.tunnel.terminate()
+            self.tunnel.wait()
+            print("🔌 SSH tunnel closed.")
 
 
 # ============================================
 # Stats
 # ============================================
-def show_stats(oracle_conn, target_db: str):
-    print("\n📊 Migration Stats")
-    print("=" * 55)
-
-    with oracle_conn.cursor() as cur:
-        cur.execute("SELECT count(*) FROM companies_raw")
-        total = cur.fetchone()[0]
+# Anti-join against the RUCs shipped by ship_migrated_rucs()
+PENDING_FILTER = " AND NOT EXISTS (SELECT 1 FROM _migrated_rucs m WHERE m.ruc = companies_raw.ruc)"
 
-        cur.execute("SELECT count(*) FROM companies_raw WHERE data->>'scrape_status' = 'enriched'")
-        enriched = cur.fetchone()[0]
-
-        cur.execute("SELECT count(*) FROM companies_raw WHERE logo_bucket_url IS NOT NULL AND logo_bucket_url != ''")
-        with_logo = cur.fetchone()[0]
-
-    print(f"\n📦 Source (empliq_dev @ Oracle):")
-    print(f"   Total companies_raw:     {total:,}")
-    print(f"   Enriched (migratable):   {enriched:,}")
-    print(f"   With logo:               {with_logo}")
 
-    for db in ["empliq_pre_prod", "empliq_prod"]:
-        try:
-            local_conn = connect_local(db)
-            with local_conn.cursor() as cur:
-                cur.execute("SELECT count(*) FROM companies")
-                companies = cur.fetchone()[0]
+def load_migrated_rucs(local_conn, target_db: str) -> RucSet:
+    """RUCs already migrated successfully to target_db (empty if there is no log yet)."""
+    try:
+        with local_conn.cursor() as cur:
+            cur.execute("SELECT ruc FROM _migration_log WHERE target_db = %s AND status = 'success'", (target_db,))
+            return RucSet.from_iterable(row[0] for row in cur)
+    except Exception:
+        local_conn.rollback()
+        return RucSet()
 
-                cur.execute(f"SELECT count(*) FROM _migration_log WHERE target_db = %s AND status = 'success'", (db,))
-                migrated = cur.fetchone()[0]
 
-                cur.execute(f"SELECT count(*) FROM _migration_log WHERE target_db = %s AND status = 'failed'", (db,))
-                failed = cur.fetchone()[0]
+def ship_migrated_rucs(oracle_conn, migrated_rucs: RucSet) -> bool:
+    """
+    COPY the already-migrated RUCs into a temp table on the source so the
+    source query can anti-join them (PENDING_FILTER) and only pending rows
+    cross the tunnel. Returns False if there is nothing to ship or the source
+    refuses temp tables; callers then filter against migrated_rucs themselves
+    (migrate() per fetched batch, show_stats() via count_pending()).
+    """
+    if not len(migrated_rucs):
+        return False
+    try:
+        with oracle_conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS _migrated_rucs (ruc VARCHAR(11) PRIMARY KEY)")
+            cur.execute("TRUNCATE _migrated_rucs")
+            cur.copy_expert("COPY _migrated_rucs (ruc) FROM STDIN",
+                            io.StringIO("".join(f"{ruc}\n" for ruc in migrated_rucs)))
+            cur.execute("ANALYZE _migrated_rucs")
+        oracle_conn.commit()
+        return True
+    except psycopg2.Error:
+        oracle_conn.rollback()
+        return False
+
+
+def count_pending(oracle_conn, migrated_rucs: RucSet) -> int:
+    """Enriched RUCs not in migrated_rucs, streamed from the source and checked client-side."""
+    pending = 0
+    with oracle_conn.cursor(name="pending_rucs") as cur:
+        cur.execute("SELECT ruc FROM companies_raw WHERE data->>'scrape_status' = 'enriched'")
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            pending += int((~migrated_rucs.contains([row[0] for row in rows])).sum())
+    oracle_conn.rollback()
+    return pending
 
-                cur.execute("SELECT count(*) FROM companies WHERE logo_url IS NOT NULL AND logo_url != ''")
-                logos = cur.fetchone()[0]
 
-            local_conn.close()
+def show_stats(conns: ConnectionManager, target_db: str):
+    print("\n📊 Migration Stats")
+    print("=" * 55)
+    oracle_conn = conns.source()
 
-            print(f"\n🎯 Target ({db}):")
-            print(f"   Companies:    {companies:,}")
-            print(f"   Migrated:     {migrated:,}")
-            print(f"   Failed:       {failed}")
-            print(f"   With logo:    {logos}")
+    # Targets: one aggregate query per DB
+    targets = {}
+    for db in ["empliq_pre_prod", "empliq_prod"]:
+        try:
+            local_conn = conns.target(db)
+            try:
+                with local_conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT c.companies, l.migrated, l.failed, c.logos
+                        FROM (
+                            SELECT count(*) AS companies,
+                                   count(*) FILTER (WHERE logo_url IS NOT NULL AND logo_url != '') AS logos
+                            FROM companies
+                        ) c, (
+                            SELECT count(*) FILTER (WHERE status = 'success') AS migrated,
+                                   count(*) FILTER (WHERE status = 'failed') AS failed
+                            FROM _migration_log WHERE target_db = %s
+                        ) l
+                    """, (db,))
+                    targets[db] = cur.fetchone()
+            finally:
+                conns.release(local_conn)
         except Exception as e:
-            print(f"\n🎯 Target ({db}): ❌ Error connecting — {e}")
+            targets[db] = e
 
-    # Pending
+    # Pending: migrated RUCs of target_db are anti-joined on the source
     try:
-        local_conn = connect_local(target_db)
-        with local_conn.cursor() as cur:
-            cur.execute("SELECT array_agg(ruc) FROM _migration_log WHERE status = 'success'")
-            migrated_rucs = cur.fetchone()[0] or []
-        local_conn.close()
+        local_conn = conns.target(target_db)
+        try:
+            migrated_rucs = load_migrated_rucs(local_conn, target_db)
+        finally:
+            conns.release(local_conn)
+        shipped = ship_migrated_rucs(oracle_conn, migrated_rucs)
+        pending_error = None
+    except Exception as e:
+        migrated_rucs, shipped, pending_error = RucSet(), False, e
+    pending_filter = PENDING_FILTER if shipped else ""
 
-        with oracle_conn.cursor() as cur:
-            if migrated_rucs:
-                cur.execute(
-                    "SELECT count(*) FROM companies_raw WHERE data->>'scrape_status' = 'enriched' AND ruc != ALL(%s)",
-                    (migrated_rucs,)
-                )
-            else:
-                cur.execute("SELECT count(*) FROM companies_raw WHERE data->>'scrape_status' = 'enriched'")
-            pending = cur.fetchone()[0]
+    # Source: a single pass over companies_raw
+    with oracle_conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT
+                count(*),
+                count(*) FILTER (WHERE data->>'scrape_status' = 'enriched'),
+                count(*) FILTER (WHERE logo_bucket_url IS NOT NULL AND logo_bucket_url != ''),
+                count(*) FILTER (WHERE data->>'scrape_status' = 'enriched'{pending_filter})
+            FROM companies_raw
+        """)
+        total, enriched, with_logo, pending = cur.fetchone()
+    oracle_conn.rollback()
 
+    if pending_error is None and not shipped and len(migrated_rucs):
+        # No temp table on the source: anti-join the enriched RUCs here
+        try:
+            pending = count_pending(oracle_conn, migrated_rucs)
+        except psycopg2.Error as e:
+            oracle_conn.rollback()
+            pending_error = e
+
+    print(f"\n📦 Source (empliq_dev @ Oracle):")
+    print(f"   Total companies_raw:     {total:,}")
+    print(f"   Enriched (migratable):   {enriched:,}")
+    print(f"   With logo:               {with_logo}")
+
+    for db, result in targets.items():
+        if isinstance(result, Exception):
+            print(f"\n🎯 Target ({db}): ❌ Error connecting — {result}")
+            continue
+        companies, migrated, failed, logos = result
+        print(f"\n🎯 Target ({db}):")
+        print(f"   Companies:    {companies:,}")
+        print(f"   Migrated:     {migrated:,}")
+        print(f"   Failed:       {failed}")
+        print(f"   With logo:    {logos}")
+
+    if pending_error is None:
         print(f"\n⏳ Pending migration → {target_db}: {pending:,} companies")
-    except Exception as e:
-        print(f"\n⏳ Could not calculate pending: {e}")
+    else:
+        print(f"\n⏳ Could not calculate pending: {pending_error}")
 
     print()
 
@@ -266,8 +372,9 @@ def show_stats(oracle_conn, target_db: str):
 # ============================================
 # Update Logos Only
 # ============================================
-def update_logos(oracle_conn, target_db: str, dry_run: bool):
+def update_logos(conns: ConnectionManager, target_db: str, dry_run: bool):
     print(f"\n🖼️  Updating logos in {target_db}...\n")
+    oracle_conn = conns.source()
 
     with oracle_conn.cursor() as cur:
         cur.execute("""
@@ -283,242 +390,451 @@ def update_logos(oracle_conn, target_db: str, dry_run: bool):
         print("   No companies with logos found.")
         return
 
-    local_conn = connect_local(target_db)
+    local_conn = conns.target(target_db)
     updated = 0
 
     try:
-        with local_conn.cursor() as cur:
+        if dry_run:
             for ruc, logo_url in rows:
-                if dry_run:
-                    print(f"   [DRY] Would update logo for RUC {ruc}: {logo_url}")
-                    updated += 1
-                else:
-                    cur.execute("""
-                        UPDATE companies SET logo_url = %s, updated_at = NOW()
-                        WHERE ruc = %s AND (logo_url IS NULL OR logo_url = '')
-                        RETURNING ruc
-                    """, (logo_url, ruc))
-                    if cur.fetchone():
-                        updated += 1
-                        print(f"   ✅ Updated logo for {ruc}")
-
-            if not dry_run:
-                local_conn.commit()
+                print(f"   [DRY] Would update logo for RUC {ruc}: {logo_url}")
+                updated += 1
+        else:
+            # One COPY + one UPDATE ... FROM instead of an UPDATE per logo
+            with local_conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TEMP TABLE _logo_updates (ruc VARCHAR(11) PRIMARY KEY, logo_url TEXT)
+                    ON COMMIT DROP
+                """)
+                cur.copy_expert("COPY _logo_updates (ruc, logo_url) FROM STDIN", io.StringIO(
+                    "".join(f"{_copy_text(ruc)}\t{_copy_text(logo_url)}\n" for ruc, logo_url in rows)
+                ))
+                cur.execute("""
+                    UPDATE companies c SET logo_url = l.logo_url, updated_at = NOW()
+                    FROM _logo_updates l
+                    WHERE c.ruc = l.ruc AND (c.logo_url IS NULL OR c.logo_url = '')
+                """)
+                updated = cur.rowcount
+            local_conn.commit()
     finally:
-        local_conn.close()
+        conns.release(local_conn)
 
     prefix = "[DRY RUN] " if dry_run else ""
     print(f"\n{prefix}Updated {updated}/{len(rows)} logos\n")
 
 
 # ============================================
-# Main Migration
+# Row Transform + Writers
 # ============================================
-def migrate(oracle_conn, target_db: str, limit: int | None, dry_run: bool):
-    print(f"\n🚀 Migrating empliq_dev → {target_db}")
-    print(f"   {'🔍 DRY RUN MODE' if dry_run else '💾 LIVE MODE'}")
-    if limit:
-        print(f"   Limit: {limit} companies")
-    print()
+# Columns written to companies (besides is_verified / timestamps), in COPY order
+COMPANY_COLUMNS = [
+    "id", "ruc", "name", "slug", "description", "industry", "employee_count",
+    "location", "website", "logo_url", "founded_year", "metadata",
+]
+
+
+def insert_company(cur, company: dict, target_db: str) -> bool:
+    """Insert one company + its _migration_log row. False if the RUC already exists."""
+    cur.execute("""
+        INSERT INTO companies (id, ruc, name, slug, description, industry, employee_count,
+                               location, website, logo_url, founded_year, is_verified, metadata,
+                               created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, false, %s::jsonb, NOW(), NOW())
+        ON CONFLICT (ruc) DO NOTHING
+        RETURNING id
+    """, (company["id"], company["ruc"], company["name"], company["slug"], company["description"],
+          company["industry"], company["employee_count"], company["location"], company["website"],
+          company["logo_url"], company["founded_year"], company["metadata"]))
+
+    result = cur.fetchone()
+    if not result:
+        return False
+
+    # Log success
+    cur.execute("""
+        INSERT INTO _migration_log (ruc, source_db, target_db, company_id, status, source_hash)
+        VALUES (%s, 'empliq_dev', %s, %s::uuid, 'success', %s)
+        ON CONFLICT (ruc, target_db) DO NOTHING
+    """, (company["ruc"], target_db, result[0], company["source_hash"]))
+    return True
+
+
+def ensure_source_hash(local_conn, dry_run: bool = False) -> bool:
+    """
+    Make sure _migration_log has source_hash (md5 of the source data). Fresh
+    targets get it from docker/init-db.sql; targets created before --sync are
+    ALTERed here, but never under --dry-run. Returns whether the column is
+    there (False as well if the target has no _migration_log yet).
+    """
+    with local_conn.cursor() as cur:
+        cur.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = '_migration_log'
+        """)
+        columns = {row[0] for row in cur}
+        if "source_hash" in columns or not columns or dry_run:
+            local_conn.rollback()
+            return "source_hash" in columns
+        cur.execute("ALTER TABLE _migration_log ADD COLUMN source_hash TEXT")
+    local_conn.commit()
+    return True
 
-    # Step 1: Get already-migrated RUCs from target DB
-    local_conn = connect_local(target_db)
 
+def log_failure(local_conn, ruc: str, target_db: str, error: Exception):
+    """Record a failed RUC in _migration_log (own transaction)."""
     try:
         with local_conn.cursor() as cur:
-            cur.execute("SELECT ruc FROM _migration_log WHERE target_db = %s AND status = 'success'", (target_db,))
-            migrated_rucs = {row[0] for row in cur.fetchall()}
+            cur.execute("""
+                INSERT INTO _migration_log (ruc, source_db, target_db, status, error_message)
+                VALUES (%s, 'empliq_dev', %s, 'failed', %s)
+                ON CONFLICT (ruc, target_db)
+                DO UPDATE SET status = 'failed', error_message = %s, migrated_at = NOW()
+            """, (ruc, target_db, str(error)[:500], str(error)[:500]))
+        local_conn.commit()
     except Exception:
         local_conn.rollback()
-        migrated_rucs = set()
-
-    print(f"   Already migrated: {len(migrated_rucs):,} companies")
 
-    # Step 2: Fetch enriched companies from Oracle (ALL fields)
-    with oracle_conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
-        query = """
-            SELECT
-                ruc,
-                razon_social,
-                COALESCE(logo_bucket_url, '') as logo_bucket_url,
-                data
-            FROM companies_raw
-            WHERE data->>'scrape_status' = 'enriched'
-            ORDER BY (data->>'nro_trabajadores')::int DESC NULLS LAST
-        """
-        if limit:
-            query += f" LIMIT {limit}"
-
-        print("   Fetching data from Oracle...")
-        cur.execute(query)
-        rows = cur.fetchall()
 
-    # Filter out already migrated
-    rows = [r for r in rows if r["ruc"] not in migrated_rucs]
-    print(f"   Found {len(rows):,} companies to migrate\n")
+def _copy_text(value) -> str:
+    """Encode one value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return r"\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
 
-    if not rows:
-        print("   ✅ No new companies to migrate!")
-        local_conn.close()
-        return
 
-    # Step 3: Process companies
-    success_count = 0
-    skip_count = 0
-    fail_count = 0
+def write_bulk(local_conn, companies: list[dict], target_db: str) -> tuple[int, int, int]:
+    """
+    Set-based writer: each batch is streamed with COPY into a temp staging
+    table, then one INSERT ... SELECT ... ON CONFLICT moves it into companies
+    and the same statement logs the inserted RUCs in _migration_log.
+    ~4 round trips per BULK_BATCH_SIZE companies instead of 2 per company.
+    If a batch fails it is retried row by row so failures are logged per RUC.
+    Returns (success, skipped, failed).
+    """
+    success = skipped = failed = 0
+    columns = ", ".join(COMPANY_COLUMNS)
 
-    # Get existing slugs from target for dedup
     with local_conn.cursor() as cur:
-        cur.execute("SELECT slug FROM companies")
-        existing_slugs = {row[0] for row in cur.fetchall()}
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS _staging_companies (
+                id UUID, ruc VARCHAR(11), name TEXT, slug TEXT, description TEXT,
+                industry TEXT, employee_count INT, location TEXT, website TEXT,
+                logo_url TEXT, founded_year INT, metadata JSONB, source_hash TEXT
+            )
+        """)
+    local_conn.commit()
+
+    for start in range(0, len(companies), BULK_BATCH_SIZE):
+        batch = companies[start:start + BULK_BATCH_SIZE]
+        buf = io.StringIO()
+        for company in batch:
+            buf.write("\t".join(_copy_text(company[c]) for c in COMPANY_COLUMNS + ["source_hash"]))
+            buf.write("\n")
+        buf.seek(0)
+
+        try:
+            with local_conn.cursor() as cur:
+                cur.execute("TRUNCATE _staging_companies")
+                cur.copy_expert(f"COPY _staging_companies ({columns}, source_hash) FROM STDIN", buf)
+                cur.execute(f"""
+                    WITH inserted AS (
+                        INSERT INTO companies ({columns}, is_verified, created_at, updated_at)
+                        SELECT {columns}, false, NOW(), NOW() FROM _staging_companies
+                        ON CONFLICT (ruc) DO NOTHING
+                        RETURNING id, ruc
+                    ), logged AS (
+                        INSERT INTO _migration_log (ruc, source_db, target_db, company_id, status, source_hash)
+                        SELECT i.ruc, 'empliq_dev', %s, i.id, 'success', s.source_hash
+                        FROM inserted i JOIN _staging_companies s ON s.ruc = i.ruc
+                        ON CONFLICT (ruc, target_db) DO NOTHING
+                    )
+                    SELECT count(*) FROM inserted
+                """, (target_db,))
+                inserted = cur.fetchone()[0]
+            local_conn.commit()
+            success += inserted
+            skipped += len(batch) - inserted
+        except Exception as e:
+            local_conn.rollback()
+            print(f"   ⚠️  Bulk batch failed ({str(e)[:80]}), retrying row by row...")
+            row_success, row_skipped, row_failed = write_rows(local_conn, batch, target_db)
+            success += row_success
+            skipped += row_skipped
+            failed += row_failed
+
+    return success, skipped, failed
+
+
+def write_rows(local_conn, companies: list[dict], target_db: str) -> tuple[int, int, int]:
+    """
+    Row-by-row writer with one SAVEPOINT per company, so a failing row only
+    rolls back itself; commits once at the end. A slug taken meanwhile by
+    another writer (unique violation on slug) is retried once as slug-ruc.
+    Returns (success, skipped, failed).
+    """
+    success = skipped = failed = 0
+    failures = []
 
     with local_conn.cursor() as cur:
-        for i, row in enumerate(rows):
-            ruc = row["ruc"]
-            razon_social = row["razon_social"] or ""
-            logo_url = row["logo_bucket_url"].strip() or None
-
-            # Parse the full JSONB data
-            data = row["data"] or {}
-            if isinstance(data, str):
+        for company in companies:
+            for attempt in range(2):
+                cur.execute("SAVEPOINT company_row")
                 try:
-                    data = json.loads(data)
-                except (json.JSONDecodeError, TypeError):
-                    data = {}
-
-            def safe_str(val):
-                """Safely get a stripped string, handling None."""
-                if val is None:
-                    return ""
-                return str(val).strip()
-
-            # Extract main fields
-            company_name = (safe_str(data.get("name")) or razon_social.strip() or "Sin Nombre")
-            description = safe_str(data.get("description")) or None
-            website = safe_str(data.get("website")) or None
-
-            # Industry: prefer sector_economico (rich), fallback to industry
-            industry = safe_str(data.get("sector_economico")) or safe_str(data.get("industry")) or None
-
-            # Employee count
-            emp_str = safe_str(data.get("nro_trabajadores"))
-            employee_count = int(emp_str) if emp_str and emp_str.isdigit() else None
-
-            # Founded year: extract from fecha_inicio (format: DD/MM/YYYY)
-            fecha_inicio = safe_str(data.get("fecha_inicio"))
-            founded_year = None
-            if fecha_inicio:
-                # Try DD/MM/YYYY format
-                parts = fecha_inicio.split("/")
-                if len(parts) == 3 and parts[2].isdigit() and len(parts[2]) == 4:
-                    founded_year = int(parts[2])
-            if not founded_year:
-                fy_str = safe_str(data.get("founded_year"))
-                founded_year = int(fy_str) if fy_str and fy_str.isdigit() else None
-
-            # Location: build from distrito, provincia, departamento
-            distrito = safe_str(data.get("distrito"))
-            provincia = safe_str(data.get("provincia"))
-            departamento = safe_str(data.get("departamento"))
-            location_parts = [p for p in [distrito, provincia, departamento] if p and p != "-"]
-            location = ", ".join(location_parts) if location_parts else None
-
-            # Generate slug, handle duplicates
-            slug = generate_slug(company_name)
-            if not slug:
-                slug = f"empresa-{ruc}"
-
-            if slug in existing_slugs:
-                slug = f"{slug}-{ruc}"
+                    if insert_company(cur, company, target_db):
+                        success += 1
+                    else:
+                        skipped += 1
+                    cur.execute("RELEASE SAVEPOINT company_row")
+                    break
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT company_row")
+                    slug_taken = (isinstance(e, psycopg2.errors.UniqueViolation)
+                                  and "slug" in (e.diag.constraint_name or ""))
+                    if attempt == 0 and slug_taken and not company["slug"].endswith(f"-{company['ruc']}"):
+                        company["slug"] = f"{company['slug']}-{company['ruc']}"
+                        continue
+                    failed += 1
+                    failures.append((company, e))
+                    break
+    local_conn.commit()
+
+    for company, e in failures:
+        log_failure(local_conn, company["ruc"], target_db, e)
+        print(f"   ❌ Failed: {company['ruc']} | {company['name'][:40]} — {str(e)[:80]}")
+
+    return success, skipped, failed
 
-            if dry_run:
-                emp_display = f"{employee_count:,}" if employee_count else "-"
-                print(f"   [DRY] {ruc} | {company_name[:45]:<45} | {slug[:35]:<35} | emp: {emp_display:>8} | {location or '-'}")
-                success_count += 1
-                existing_slugs.add(slug)
-                continue
 
-            # Build rich metadata with ALL available source data
-            metadata_dict = {
-                "razon_social": razon_social,
-                "source": "empliq_dev",
-                "migrated_at": datetime.now(tz=__import__('datetime').timezone.utc).isoformat(),
-            }
+# ============================================
+# Parallel Workers
+# ============================================
+def migrate_shard(shard: int, source: dict, target: dict, target_db: str,
+                  slugs: dict[str, str], bulk: bool) -> tuple[int, int, int]:
+    """
+    Worker: migrate one shard of pending RUCs with its own source/target
+    connections. Slugs come pre-planned from the main process (same order
+    and dedup as a serial run). Returns (success, skipped, failed).
+    """
+    src_conn = psycopg2.connect(**source)
+    local_conn = psycopg2.connect(**target)
+    success = skipped = failed = 0
+    rucs = list(slugs)
 
-            # Add all rich fields if present
-            rich_fields = [
-                "direccion", "distrito", "provincia", "departamento",
-                "sector_economico", "actividad_ciiu", "tipo_empresa",
-                "condicion", "estado", "fecha_inicio", "fecha_inscripcion",
-                "telefonos", "ejecutivos",
-                "historial_trabajadores", "historial_condiciones",
-                "historial_direcciones", "establecimientos_anexos",
-                "comercio_exterior", "referencia",
-                "proveedor_estado", "tier",
-            ]
-            for field in rich_fields:
-                val = data.get(field)
-                if val is not None and val != "" and val != []:
-                    metadata_dict[field] = val
+    try:
+        for start in range(0, len(rucs), FETCH_SIZE):
+            with src_conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+                cur.execute("""
+                    SELECT
+                        ruc,
+                        razon_social,
+                        COALESCE(logo_bucket_url, '') as logo_bucket_url,
+                        data,
+                        md5(data::text) AS source_hash
+                    FROM companies_raw
+                    WHERE ruc = ANY(%s)
+                """, (rucs[start:start + FETCH_SIZE],))
+                rows = cur.fetchall()
+            src_conn.rollback()
+
+            companies = transform_batch(rows)
+            for company in companies:
+                company["slug"] = slugs[company["ruc"]]
+
+            writer = write_bulk if bulk else write_rows
+            batch_success, batch_skipped, batch_failed = writer(local_conn, companies, target_db)
+            success += batch_success
+            skipped += batch_skipped
+            failed += batch_failed
+            print(f"   ✅ Shard {shard}: {success:,}/{len(rucs):,} migrated...")
+    finally:
+        src_conn.close()
+        local_conn.close()
 
-            metadata = json.dumps(metadata_dict, default=str)
+    return success, skipped, failed
 
-            company_id = str(uuid.uuid4())
 
-            try:
-                cur.execute("""
-                    INSERT INTO companies (id, ruc, name, slug, description, industry, employee_count,
-                                           location, website, logo_url, founded_year, is_verified, metadata,
-                                           created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, false, %s::jsonb, NOW(), NOW())
-                    ON CONFLICT (ruc) DO NOTHING
-                    RETURNING id
-                """, (company_id, ruc, company_name, slug, description, industry,
-                      employee_count, location, website, logo_url, founded_year, metadata))
-
-                result = cur.fetchone()
-
-                if result:
-                    inserted_id = result[0]
-                    # Log success
-                    cur.execute("""
-                        INSERT INTO _migration_log (ruc, source_db, target_db, company_id, status)
-                        VALUES (%s, 'empliq_dev', %s, %s::uuid, 'success')
-                        ON CONFLICT (ruc, target_db) DO NOTHING
-                    """, (ruc, target_db, inserted_id))
+# ============================================
+# Main Migration
+# ============================================
+def migrate(conns: ConnectionManager, target_db: str, limit: int | None, dry_run: bool, bulk: bool = False,
+            workers: int = 1, transform_workers: int = 0):
+    print(f"\n🚀 Migrating empliq_dev → {target_db}")
+    print(f"   {'🔍 DRY RUN MODE' if dry_run else '💾 LIVE MODE'}{' (bulk COPY)' if bulk and not dry_run else ''}")
+    parallel = workers > 1 and not dry_run
+    if parallel:
+        print(f"   Workers: {workers}")
+    elif transform_workers:
+        print(f"   Transform workers: {transform_workers}")
+    if limit:
+        print(f"   Limit: {limit} companies")
+    print()
 
-                    success_count += 1
-                    existing_slugs.add(slug)
-                else:
-                    skip_count += 1
-
-                # Commit in batches
-                if success_count % BATCH_SIZE == 0 and success_count > 0:
-                    local_conn.commit()
-                    print(f"   ✅ Progress: {success_count:,}/{len(rows):,} migrated...")
-
-            except Exception as e:
-                local_conn.rollback()
-                fail_count += 1
-                # Log failure
-                try:
-                    cur.execute("""
-                        INSERT INTO _migration_log (ruc, source_db, target_db, status, error_message)
-                        VALUES (%s, 'empliq_dev', %s, 'failed', %s)
-                        ON CONFLICT (ruc, target_db)
-                        DO UPDATE SET status = 'failed', error_message = %s, migrated_at = NOW()
-                    """, (ruc, target_db, str(e)[:500], str(e)[:500]))
-                    local_conn.commit()
-                except Exception:
-                    local_conn.rollback()
+    # Step 1: Get already-migrated RUCs from target DB
+    oracle_conn = conns.source()
+    local_conn = conns.target(target_db)
+    if not dry_run:
+        ensure_source_hash(local_conn)
+
+    migrated_rucs = load_migrated_rucs(local_conn, target_db)
+    print(f"   Already migrated: {len(migrated_rucs):,} companies")
+
+    # Get existing slugs (and RUCs, for bulk mode) from target for dedup
+    with local_conn.cursor() as cur:
+        cur.execute("SELECT slug, ruc FROM companies")
+        existing = cur.fetchall()
+    existing_slugs = {slug for slug, _ in existing}
+    existing_rucs = RucSet.from_iterable(ruc for _, ruc in existing if ruc)
+
+    # Step 2: Stream enriched companies from Oracle (ALL fields) with a
+    # server-side cursor: FETCH_SIZE rows per round trip. Batches are
+    # transformed inline, or with --transform-workers in a process pool a
+    # few batches ahead of the writer (migration_transform.py). Already
+    # migrated RUCs are anti-joined on the source, so re-runs only transfer
+    # pending rows. Parallel runs only plan slugs here (ruc + name), the
+    # workers fetch the full rows of their shard.
+    data_column = "jsonb_build_object('name', data->'name') AS data" if parallel else "data"
+    query = f"""
+        SELECT
+            ruc,
+            razon_social,
+            COALESCE(logo_bucket_url, '') as logo_bucket_url,
+            {data_column},
+            md5(data::text) AS source_hash
+        FROM companies_raw
+        WHERE data->>'scrape_status' = 'enriched'
+    """
+    if ship_migrated_rucs(oracle_conn, migrated_rucs):
+        query += PENDING_FILTER
+    query += " ORDER BY (data->>'nro_trabajadores')::int DESC NULLS LAST, ruc"
+    if limit:
+        query += f" LIMIT {limit}"
 
-                print(f"   ❌ Failed: {ruc} | {company_name[:40]} — {str(e)[:80]}")
+    # Step 3: Process companies
+    total = 0
+    success_count = 0
+    skip_count = 0
+    fail_count = 0
+    pending = []
+    shards = [{} for _ in range(workers)]  # ruc → planned slug, per worker
+
+    def flush_bulk():
+        nonlocal success_count, skip_count, fail_count
+        success, skipped, failed = write_bulk(local_conn, pending, target_db)
+        success_count += success
+        skip_count += skipped
+        fail_count += failed
+        pending.clear()
+        print(f"   ✅ Progress: {success_count:,} migrated ({total:,} read)...")
+
+    print("   Streaming data from Oracle...")
+    with oracle_conn.cursor(name="migrate_source", cursor_factory=psycopg2.extras.DictCursor) as src, \
+            local_conn.cursor() as cur, TransformPool(0 if parallel else transform_workers) as transformer:
+        src.execute(query)
+
+        def source_batches():
+            nonlocal total
+            while True:
+                rows = src.fetchmany(FETCH_SIZE)
+                if not rows:
+                    return
+                # Filter out already migrated (no-op when the source anti-joined them)
+                done = migrated_rucs.contains([r["ruc"] for r in rows])
+                rows = [r for r, migrated in zip(rows, done) if not migrated]
+                total += len(rows)
+                yield rows
+
+        if parallel:
+            for rows in source_batches():
+                base_slugs = generate_slugs(company_name(r["data"], r["razon_social"]) for r in rows)
+                for row, base_slug in zip(rows, base_slugs):
+                    # Same skip + slug dedup as the serial run, in source order
+                    ruc = row["ruc"]
+                    if ruc in existing_rucs:
+                        skip_count += 1
+                        continue
+                    slug = base_slug or f"empresa-{ruc}"
+                    if slug in existing_slugs:
+                        slug = f"{slug}-{ruc}"
+                    existing_slugs.add(slug)
+                    shards[zlib.crc32(ruc.encode()) % workers][ruc] = slug
+        else:
+            for companies in transformer.map(source_batches()):
+                for company in companies:
+                    ruc = company["ruc"]
+
+                    # Generate slug, handle duplicates
+                    if company["slug"] in existing_slugs:
+                        company["slug"] = f"{company['slug']}-{ruc}"
+                    slug = company["slug"]
+
+                    if dry_run:
+                        employee_count = company["employee_count"]
+                        emp_display = f"{employee_count:,}" if employee_count else "-"
+                        print(f"   [DRY] {ruc} | {company['name'][:45]:<45} | {slug[:35]:<35} | emp: {emp_display:>8} | {company['location'] or '-'}")
+                        success_count += 1
+                        existing_slugs.add(slug)
+                        continue
+
+                    if bulk:
+                        # Same outcome as ON CONFLICT (ruc) DO NOTHING in the row path:
+                        # skipped RUCs never claim a slug
+                        if ruc in existing_rucs:
+                            skip_count += 1
+                            continue
+                        pending.append(company)
+                        existing_slugs.add(slug)
+                        if len(pending) >= BULK_BATCH_SIZE:
+                            flush_bulk()
+                        continue
+
+                    try:
+                        if insert_company(cur, company, target_db):
+                            success_count += 1
+                            existing_slugs.add(slug)
+                        else:
+                            skip_count += 1
+
+                        # Commit in batches
+                        if success_count % BATCH_SIZE == 0 and success_count > 0:
+                            local_conn.commit()
+                            print(f"   ✅ Progress: {success_count:,} migrated ({total:,} read)...")
+
+                    except Exception as e:
+                        local_conn.rollback()
+                        fail_count += 1
+                        # Log failure
+                        log_failure(local_conn, ruc, target_db, e)
+
+                        print(f"   ❌ Failed: {ruc} | {company['name'][:40]} — {str(e)[:80]}")
 
         # Final commit
         if not dry_run:
             local_conn.commit()
 
-    local_conn.close()
+    if pending:
+        flush_bulk()
+
+    conns.release(local_conn)
+
+    if parallel and total:
+        print(f"   Planned {total - skip_count:,} companies in {workers} shards")
+        source = conns.source_params()
+        target = conns.target_params(target_db)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(migrate_shard, i, source, target, target_db, slugs, bulk)
+                for i, slugs in enumerate(shards) if slugs
+            ]
+            for future in as_completed(futures):
+                success, skipped, failed = future.result()
+                success_count += success
+                skip_count += skipped
+                fail_count += failed
+                print(f"   ✅ Progress: {success_count:,}/{total:,} migrated...")
+
+    if not total:
+        print("   ✅ No new companies to migrate!")
+        return
 
     # Summary
     print(f"\n{'=' * 55}")
@@ -526,7 +842,120 @@ def migrate(oracle_conn, target_db: str, limit: int | None, dry_run: bool):
     print(f"   ✅ Migrated:   {success_count:,}")
     print(f"   ⏭️  Skipped:    {skip_count:,}")
     print(f"   ❌ Failed:     {fail_count}")
-    print(f"   Total:         {len(rows):,}")
+    print(f"   Total:         {total:,}")
+    if dry_run:
+        print(f"   🔍 DRY RUN — no data was written")
+    print()
+
+
+# ============================================
+# Sync Changed Companies
+# ============================================
+def sync(conns: ConnectionManager, target_db: str, dry_run: bool):
+    """
+    Re-apply source changes to already migrated companies. Each migrated RUC
+    has the md5 of its source data in _migration_log.source_hash; the pairs
+    are shipped to the source, which returns only rows whose md5(data::text)
+    differs. Those are updated in batches. Slugs, ids and is_verified are
+    never touched, empty source values do not blank existing ones and
+    metadata keys are merged, so app-side data is kept.
+    """
+    print(f"\n🔄 Syncing changed companies empliq_dev → {target_db}")
+    print(f"   {'🔍 DRY RUN MODE' if dry_run else '💾 LIVE MODE'}\n")
+
+    oracle_conn = conns.source()
+    local_conn = conns.target(target_db)
+    # Dry runs on a target without the column treat every row as changed
+    hash_column = "source_hash" if ensure_source_hash(local_conn, dry_run) else "NULL"
+    try:
+        with local_conn.cursor() as cur:
+            cur.execute(f"SELECT ruc, {hash_column} FROM _migration_log WHERE target_db = %s AND status = 'success'",
+                        (target_db,))
+            synced = cur.fetchall()
+    except psycopg2.errors.UndefinedTable:
+        local_conn.rollback()
+        synced = []  # nothing migrated to this target yet
+    print(f"   Migrated companies: {len(synced):,}")
+
+    if not synced:
+        print("   ✅ Nothing to sync!")
+        conns.release(local_conn)
+        return
+
+    # Ship (ruc, hash) to the source; rows without a hash yet count as changed
+    with oracle_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS _synced_hashes (ruc VARCHAR(11) PRIMARY KEY, source_hash TEXT)")
+        cur.execute("TRUNCATE _synced_hashes")
+        cur.copy_expert("COPY _synced_hashes (ruc, source_hash) FROM STDIN",
+                        io.StringIO("".join(f"{ruc}\t{_copy_text(h)}\n" for ruc, h in synced)))
+        cur.execute("ANALYZE _synced_hashes")
+    oracle_conn.commit()
+
+    changed = 0
+    updated = 0
+    with oracle_conn.cursor(name="sync_source", cursor_factory=psycopg2.extras.DictCursor) as src, \
+            local_conn.cursor() as cur:
+        src.execute("""
+            SELECT
+                c.ruc,
+                c.razon_social,
+                COALESCE(c.logo_bucket_url, '') as logo_bucket_url,
+                c.data,
+                md5(c.data::text) AS source_hash
+            FROM companies_raw c
+            JOIN _synced_hashes h ON h.ruc = c.ruc
+            WHERE c.data->>'scrape_status' = 'enriched'
+              AND h.source_hash IS DISTINCT FROM md5(c.data::text)
+        """)
+        while True:
+            rows = src.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            companies = transform_batch(rows)
+            changed += len(companies)
+
+            if dry_run:
+                for company in companies:
+                    print(f"   [DRY] {company['ruc']} | {company['name'][:45]:<45} | {company['location'] or '-'}")
+                continue
+
+            psycopg2.extras.execute_values(cur, """
+                UPDATE companies c SET
+                    name = v.name,
+                    description = COALESCE(v.description, c.description),
+                    industry = COALESCE(v.industry, c.industry),
+                    employee_count = COALESCE(v.employee_count, c.employee_count),
+                    location = COALESCE(v.location, c.location),
+                    website = COALESCE(v.website, c.website),
+                    logo_url = COALESCE(v.logo_url, c.logo_url),
+                    founded_year = COALESCE(v.founded_year, c.founded_year),
+                    metadata = COALESCE(c.metadata, '{}'::jsonb) || v.metadata,
+                    updated_at = NOW()
+                FROM (VALUES %s) AS v(ruc, name, description, industry, employee_count,
+                                      location, website, logo_url, founded_year, metadata)
+                WHERE c.ruc = v.ruc
+            """, [
+                (c["ruc"], c["name"], c["description"], c["industry"], c["employee_count"],
+                 c["location"], c["website"], c["logo_url"], c["founded_year"], c["metadata"])
+                for c in companies
+            ], template="(%s, %s, %s, %s, %s::int, %s, %s, %s, %s::int, %s::jsonb)", page_size=len(companies))
+            updated += cur.rowcount
+
+            psycopg2.extras.execute_values(cur, """
+                UPDATE _migration_log l SET source_hash = v.source_hash, migrated_at = NOW()
+                FROM (VALUES %s) AS v(ruc, target_db, source_hash)
+                WHERE l.ruc = v.ruc AND l.target_db = v.target_db
+            """, [(c["ruc"], target_db, c["source_hash"]) for c in companies], page_size=len(companies))
+            local_conn.commit()
+            print(f"   ✅ Progress: {updated:,} updated ({changed:,} changed)...")
+
+    conns.release(local_conn)
+
+    # Summary
+    print(f"\n{'=' * 55}")
+    print(f"📊 Sync Summary → {target_db}")
+    print(f"   🔄 Changed in source: {changed:,}")
+    print(f"   ✅ Updated:           {updated:,}")
     if dry_run:
         print(f"   🔍 DRY RUN — no data was written")
     print()
@@ -553,6 +982,14 @@ def main():
                         help="Only update logo URLs for existing companies")
     parser.add_argument("--stats", action="store_true",
                         help="Show migration statistics")
+    parser.add_argument("--sync", action="store_true",
+                        help="Update already migrated companies whose source data changed")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Set-based load: COPY into a staging table + one INSERT per batch")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parallel workers, each migrating a shard of pending RUCs")
+    parser.add_argument("--transform-workers", type=int, default=0,
+                        help="Processes transforming fetched batches ahead of the writer (serial mode)")
     parser.add_argument("--reset", action="store_true",
                         help="Clear all companies and migration log before migrating")
     args = parser.parse_args()
@@ -563,42 +1000,36 @@ def main():
     print(f"║  Mode: {args.mode:<8} Target: {args.target:<20}║")
     print("╚══════════════════════════════════════════════╝")
 
-    tunnel = None
-    oracle_conn = None
-
     if args.mode == "oracle":
         # Oracle mode: both DBs accessible on Docker network
         print("\n🔌 Connecting to musuq-postgres (Docker network)...")
-        try:
-            oracle_conn = connect_oracle_source_direct()
-        except Exception as e:
-            print(f"❌ Could not connect to source DB: {e}")
-            sys.exit(1)
-        print("   ✅ Connected to empliq_dev (musuq-postgres)")
-
-        # Override connect_local to use oracle target
-        global connect_local
-        _original_connect_local = connect_local
-        connect_local = connect_oracle_target
     else:
         # Local mode: SSH tunnel to Oracle, write to local Docker PG
         print("\n🔌 Connecting to Oracle server via SSH tunnel...")
-        try:
-            tunnel, oracle_conn = connect_oracle_via_ssh()
-        except Exception as e:
-            print(f"❌ Could not connect to Oracle: {e}")
-            sys.exit(1)
-        print("   ✅ Connected to empliq_dev")
+    try:
+        conns = ConnectionManager(args.mode)
+    except Exception as e:
+        print(f"❌ Could not connect to Oracle: {e}")
+        sys.exit(1)
+    try:
+        conns.source()
+    except Exception as e:
+        conns.close()
+        print(f"❌ Could not connect to source DB: {e}")
+        sys.exit(1)
+    print(f"   ✅ Connected to empliq_dev{' (musuq-postgres)' if args.mode == 'oracle' else ''}")
 
     try:
         if args.stats:
-            show_stats(oracle_conn, args.target)
+            show_stats(conns, args.target)
         elif args.update_logos:
-            update_logos(oracle_conn, args.target, args.dry_run)
+            update_logos(conns, args.target, args.dry_run)
+        elif args.sync:
+            sync(conns, args.target, args.dry_run)
         else:
             if args.reset:
                 print(f"\n🗑️  Resetting {args.target}...")
-                target_conn = connect_local(args.target)
+                target_conn = conns.target(args.target)
                 with target_conn.cursor() as cur:
                     # Safely delete tables that exist
                     for table in ["benefits", "salaries", "reviews", "interviews", "positions"]:
@@ -609,17 +1040,12 @@ def main():
                     cur.execute("DELETE FROM companies")
                     cur.execute("DELETE FROM _migration_log WHERE target_db = %s", (args.target,))
                     target_conn.commit()
-                target_conn.close()
+                conns.release(target_conn)
                 print(f"   ✅ Cleared all data in {args.target}")
-            migrate(oracle_conn, args.target, args.limit, args.dry_run)
+            migrate(conns, args.target, args.limit, args.dry_run, args.bulk, args.workers, args.transform_workers)
     finally:
-        oracle_conn.close()
-        if tunnel:
-            tunnel.terminate()
-            tunnel.wait()
-            print("🔌 SSH tunnel closed.")
+        conns.close()
         print()
 
-
 if __name__ == "__main__":
     main()
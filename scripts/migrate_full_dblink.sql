@@ -11,24 +11,48 @@
 CREATE EXTENSION IF NOT EXISTS dblink;
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
--- 2. Helper: generate slug from company name (matches Python logic)
+-- 2. Helper: generate slug from company name
+--    Generated by `python3 scripts/slugs.py --sql` (same table as the Python
+--    generate_slug); regenerate instead of editing by hand.
 CREATE OR REPLACE FUNCTION pg_temp.generate_slug(input_name TEXT)
 RETURNS TEXT AS $$
 DECLARE
   result TEXT;
 BEGIN
-  result := lower(trim(COALESCE(input_name, '')));
+  result := COALESCE(input_name, '');
+  result := replace(result, 'Æ', 'ae');
+  result := replace(result, 'Þ', 'th');
+  result := replace(result, 'ß', 'ss');
+  result := replace(result, 'æ', 'ae');
+  result := replace(result, 'þ', 'th');
+  result := replace(result, 'Ĳ', 'ij');
+  result := replace(result, 'ĳ', 'ij');
+  result := replace(result, 'Œ', 'oe');
+  result := replace(result, 'œ', 'oe');
+  result := replace(result, 'Ǆ', 'dz');
+  result := replace(result, 'ǅ', 'dz');
+  result := replace(result, 'ǆ', 'dz');
+  result := replace(result, 'Ǉ', 'lj');
+  result := replace(result, 'ǈ', 'lj');
+  result := replace(result, 'ǉ', 'lj');
+  result := replace(result, 'Ǌ', 'nj');
+  result := replace(result, 'ǋ', 'nj');
+  result := replace(result, 'ǌ', 'nj');
+  result := replace(result, 'Ǣ', 'ae');
+  result := replace(result, 'ǣ', 'ae');
+  result := replace(result, 'Ǳ', 'dz');
+  result := replace(result, 'ǲ', 'dz');
+  result := replace(result, 'ǳ', 'dz');
+  result := replace(result, 'Ǽ', 'ae');
+  result := replace(result, 'ǽ', 'ae');
+  result := replace(result, 'ẞ', 'ss');
   result := translate(result,
-    'áàäâéèëêíìïîóòöôúùüûñÁÀÄÂÉÈËÊÍÌÏÎÓÒÖÔÚÙÜÛÑ',
-    'aaaaeeeeiiiioooouuuunaaaaeeeeiiiioooouuuun');
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZÀÁÂÃÄÅÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖØÙÚÛÜÝàáâãäåçèéêëìíîïðñòóôõöøùúûüýÿĀāĂăĄąĆćĈĉĊċČčĎďĐđĒēĔĕĖėĘęĚěĜĝĞğĠġĢģĤĥĦħĨĩĪīĬĭĮįİıĴĵĶķĸĹĺĻļĽľĿŀŁłŃńŅņŇňŉŌōŎŏŐőŔŕŖŗŘřŚśŜŝŞşŠšŢţŤťŦŧŨũŪūŬŭŮůŰűŲųŴŵŶŷŸŹźŻżŽžſƀƁƂƃƇƈƊƋƌƑƒƓƗƘƙƚƝƞƟƠơƤƥƫƬƭƮƯưƲƳƴƵƶǍǎǏǐǑǒǓǔǕǖǗǘǙǚǛǜǞǟǠǡǤǥǦǧǨǩǪǫǬǭǰǴǵǸǹǺǻǾǿȀȁȂȃȄȅȆȇȈȉȊȋȌȍȎȏȐȑȒȓȔȕȖȗȘșȚțȞȟȠȡȤȥȦȧȨȩȪȫȬȭȮȯȰȱȲȳȴȵȶȺȻȼȽȾȿɀɃɆɇɈɉɋɌɍɎɏḀḁḂḃḄḅḆḇḈḉḊḋḌḍḎḏḐḑḒḓḔḕḖḗḘḙḚḛḜḝḞḟḠḡḢḣḤḥḦḧḨḩḪḫḬḭḮḯḰḱḲḳḴḵḶḷḸḹḺḻḼḽḾḿṀṁṂṃṄṅṆṇṈṉṊṋṌṍṎṏṐṑṒṓṔṕṖṗṘṙṚṛṜṝṞṟṠṡṢṣṤṥṦṧṨṩṪṫṬṭṮṯṰṱṲṳṴṵṶṷṸṹṺṻṼṽṾṿẀẁẂẃẄẅẆẇẈẉẊẋẌẍẎẏẐẑẒẓẔẕẖẗẘẙẚẛẠạẢảẤấẦầẨẩẪẫẬậẮắẰằẲẳẴẵẶặẸẹẺẻẼẽẾếỀềỂểỄễỆệỈỉỊịỌọỎỏỐốỒồỔổỖỗỘộỚớỜờỞởỠỡỢợỤụỦủỨứỪừỬửỮữỰựỲỳỴỵỶỷỸỹỾỿ',
+    'abcdefghijklmnopqrstuvwxyzaaaaaaceeeeiiiidnoooooouuuuyaaaaaaceeeeiiiidnoooooouuuuyyaaaaaaccccccccddddeeeeeeeeeegggggggghhhhiiiiiiiiiijjkkkllllllllllnnnnnnnoooooorrrrrrssssssssttttttuuuuuuuuuuuuwwyyyzzzzzzsbbbbccdddffgikklnnoooppttttuuvyyzzaaiioouuuuuuuuuuaaaaggggkkoooojggnnaaooaaaaeeeeiiiioooorrrruuuusstthhndzzaaeeooooooooyylntaccltszbeejjqrryyaabbbbbbccddddddddddeeeeeeeeeeffgghhhhhhhhhhiiiikkkkkkllllllllmmmmmmnnnnnnnnoooooooopppprrrrrrrrssssssssssttttttttuuuuuuuuuuvvvvwwwwwwwwwwxxxxyyzzzzzzhtwyasaaaaaaaaaaaaaaaaaaaaaaaaeeeeeeeeeeeeeeeeiiiioooooooooooooooooooooooouuuuuuuuuuuuuuyyyyyyyyyy');
   result := regexp_replace(result, '[^a-z0-9]+', '-', 'g');
-  result := trim(both '-' from result);
-  IF result = '' OR result IS NULL THEN
-    result := 'empresa';
-  END IF;
-  RETURN result;
+  RETURN trim(both '-' from result);
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql IMMUTABLE;
 
 -- 3. Full reset (safe: 0 user data in prod)
 DO $$
@@ -73,9 +97,9 @@ BEGIN
       uuid_generate_v4() as id,
       ruc,
       COALESCE(NULLIF(trim(data->>'name'), ''), trim(razon_social), 'Sin Nombre') as name,
-      pg_temp.generate_slug(
+      COALESCE(NULLIF(pg_temp.generate_slug(
         COALESCE(NULLIF(trim(data->>'name'), ''), trim(razon_social), 'Sin Nombre')
-      ) as base_slug,
+      ), ''), 'empresa') as base_slug,
       NULLIF(trim(data->>'description'), '') as description,
       COALESCE(
         NULLIF(trim(data->>'sector_economico'), ''),
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Row transform for migrate_companies.py: companies_raw row → companies columns.
+
+psycopg2 already decodes the JSONB `data` column into a dict, so the transform
+never re-parses it (only a JSONB *string* scalar is still json.loads'ed). The
+field mapping is resolved once at import (RICH_FIELDS as a tuple, bound
+methods hoisted out of the loop), slugs for a whole batch come from one
+generate_slugs() pass, and metadata is serialized with orjson when installed
+(json.dumps otherwise; both produce the same JSONB).
+
+Source rows are (ruc, razon_social, logo_bucket_url, data, source_hash), in
+that order — DictRow or plain tuples:
+
+    companies = transform_batch(rows)               # list of dicts, COMPANY_COLUMNS + source_hash
+    company = transform_company(row)                # single row
+
+    with TransformPool(workers=3) as pool:           # transform ahead of the writer
+        for companies in pool.map(batches):
+            write(companies)
+"""
+
+import json
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Sequence
+
+from slugs import generate_slugs
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RICH_FIELDS = (
+    "direccion", "distrito", "provincia", "departamento",
+    "sector_economico", "actividad_ciiu", "tipo_empresa",
+    "condicion", "estado", "fecha_inicio", "fecha_inscripcion",
+    "telefonos", "ejecutivos",
+    "historial_trabajadores", "historial_condiciones",
+    "historial_direcciones", "establecimientos_anexos",
+    "comercio_exterior", "referencia",
+    "proveedor_estado", "tier",
+)
+
+
+def safe_str(val):
+    """Safely get a stripped string, handling None."""
+    if val is None:
+        return ""
+    return str(val).strip()
+
+
+def company_name(data: dict, razon_social: str | None) -> str:
+    return safe_str(data.get("name")) or (razon_social or "").strip() or "Sin Nombre"
+
+
+def dumps(value) -> str:
+    """JSON text for a %s::jsonb / COPY value (orjson when available)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits
+    return json.dumps(value, default=str)
+
+
+def _as_dict(data) -> dict:
+    if not data:
+        return {}
+    if isinstance(data, str):
+        # JSONB string scalar (or a text column): parse it once here
+        try:
+            return json.loads(data)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    return data
+
+
+def _transform(ruc, razon_social, logo_bucket_url, data: dict, source_hash, migrated_at: str) -> dict:
+    get = data.get
+    razon_social = razon_social or ""
+
+    name = safe_str(get("name")) or razon_social.strip() or "Sin Nombre"
+    description = safe_str(get("description")) or None
+    website = safe_str(get("website")) or None
+
+    # Industry: prefer sector_economico (rich), fallback to industry
+    industry = safe_str(get("sector_economico")) or safe_str(get("industry")) or None
+
+    # Employee count
+    emp_str = safe_str(get("nro_trabajadores"))
+    employee_count = int(emp_str) if emp_str and emp_str.isdigit() else None
+
+    # Founded year: extract from fecha_inicio (format: DD/MM/YYYY)
+    fecha_inicio = safe_str(get("fecha_inicio"))
+    founded_year = None
+    if fecha_inicio:
+        parts = fecha_inicio.split("/")
+        if len(parts) == 3 and parts[2].isdigit() and len(parts[2]) == 4:
+            founded_year = int(parts[2])
+    if not founded_year:
+        fy_str = safe_str(get("founded_year"))
+        founded_year = int(fy_str) if fy_str and fy_str.isdigit() else None
+
+    # Location: build from distrito, provincia, departamento
+    location_parts = [
+        p for p in (safe_str(get("distrito")), safe_str(get("provincia")), safe_str(get("departamento")))
+        if p and p != "-"
+    ]
+    location = ", ".join(location_parts) if location_parts else None
+
+    # Build rich metadata with ALL available source data
+    metadata = {"razon_social": razon_social, "source": "empliq_dev", "migrated_at": migrated_at}
+    for field in RICH_FIELDS:
+        val = get(field)
+        if val is not None and val != "" and val != []:
+            metadata[field] = val
+
+    return {
+        "id": str(uuid.uuid4()),
+        "ruc": ruc,
+        "name": name,
+        "slug": None,
+        "description": description,
+        "industry": industry,
+        "employee_count": employee_count,
+        "location": location,
+        "website": website,
+        "logo_url": logo_bucket_url.strip() or None,
+        "founded_year": founded_year,
+        "metadata": dumps(metadata),
+        "source_hash": source_hash,
+    }
+
+
+def transform_batch(rows: Sequence) -> list[dict]:
+    """
+    Map a batch of companies_raw rows to companies columns (slug not yet
+    deduplicated). One migrated_at timestamp and one slug pass per batch.
+    """
+    migrated_at = datetime.now(tz=timezone.utc).isoformat()
+    companies = [
+        _transform(ruc, razon_social, logo_bucket_url, _as_dict(data), source_hash, migrated_at)
+        for ruc, razon_social, logo_bucket_url, data, source_hash in rows
+    ]
+    for company, slug in zip(companies, generate_slugs([c["name"] for c in companies])):
+        company["slug"] = slug or f"empresa-{company['ruc']}"
+    return companies
+
+
+def transform_company(row) -> dict:
+    """Map a single companies_raw row to companies columns (slug not yet deduplicated)."""
+    return transform_batch([row])[0]
+
+
+class TransformPool:
+    """
+    Runs transform_batch in worker processes ahead of the writer: while the
+    main process writes batch N, batches N+1 … N+workers are being fetched
+    and transformed. workers=0 transforms inline.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+    def map(self, batches: Iterable[Sequence]) -> Iterator[list[dict]]:
+        """Transformed batches, in the same order as `batches`."""
+        if self.executor is None:
+            for rows in batches:
+                yield transform_batch(rows)
+            return
+
+        in_flight = deque()
+        for rows in batches:
+            # Plain tuples pickle faster than DictRow
+            in_flight.append(self.executor.submit(transform_batch, [tuple(row) for row in rows]))
+            if len(in_flight) > self.workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
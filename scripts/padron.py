@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""
+Lector streaming del Padrón RUC (SUNAT), compartido por los scripts analyze_*.
+
+- Lee el CSV (~3.2GB, ~13M líneas) UNA sola vez, decodificando latin-1
+- Filtra personas jurídicas (RUC empieza con 2) y opcionalmente solo ACTIVAS
+- Entrega lotes de registros tipados a consumidores enchufables
+  (tiering, escritura Parquet, estadísticas) dentro de la misma pasada
+
+Uso como librería:
+    from padron import scan, TierCollector, ParquetSink
+    stats = scan(PADRON, [TierCollector(existing), ParquetSink(out)])
+
+Uso como script (refresh mensual completo = una sola lectura del padrón):
+    python3 padron.py
+"""
+
+import csv
+import mmap
+import os
+import re
+import shutil
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from rucset import RucSet
+
+PADRON = Path("/home/jimmy/Descargas/PadronRUC_202601.csv")
+EXISTING = Path("/home/jimmy/sueldos-organigrama/data/all_companies.csv")
+OUT_DIR = Path("/home/jimmy/sueldos-organigrama/data")
+
+BATCH_SIZE = 100_000  # registros por lote entregado a los consumidores
+NUM_FIELDS = 16
+
+# Nombres cortos de columnas (mismo orden que el CSV de SUNAT)
+COLUMNS = [
+    'RUC', 'Estado', 'Condicion', 'Tipo',
+    'Actividad_CIIU3_Principal', 'Actividad_CIIU3_Secundaria',
+    'Actividad_CIIU4_Principal', 'NroTrab', 'TipoFacturacion',
+    'TipoContabilidad', 'ComercioExterior', 'UBIGEO',
+    'Departamento', 'Provincia', 'Distrito', 'PERIODO_PUBLICACION',
+]
+
+# Columnas de los CSV de tiers que consume n8n
+TIER_FIELDS = [
+    'RUC', 'RazonSocial', 'Estado', 'Condicion', 'Tipo', 'Actividad_CIIU3_Principal',
+    'NroTrab', 'NroTrab_num', 'Departamento', 'Provincia', 'Distrito',
+]
+
+SIN_DATO = ('NO DISPONIBLE', '', '0')
+
+
+class Registro(NamedTuple):
+    """Una fila del padrón con NroTrab ya convertido a entero (None si no hay dato)."""
+    RUC: str
+    Estado: str
+    Condicion: str
+    Tipo: str
+    Actividad_CIIU3_Principal: str
+    Actividad_CIIU3_Secundaria: str
+    Actividad_CIIU4_Principal: str
+    NroTrab: str
+    TipoFacturacion: str
+    TipoContabilidad: str
+    ComercioExterior: str
+    UBIGEO: str
+    Departamento: str
+    Provincia: str
+    Distrito: str
+    PERIODO_PUBLICACION: str
+    NroTrab_num: int | None
+
+
+def _entero(v: str, max_digitos: int) -> int | None:
+    """Entero de dígitos ASCII que entra en el tipo de la columna; None si no ('', '²', '20ABC')."""
+    return int(v) if v.isascii() and v.isdigit() and len(v) <= max_digitos else None
+
+
+def parse_nro_trab(nro: str) -> int | None:
+    """'NO DISPONIBLE', '' y '0' no cuentan como dato de trabajadores (ni lo que no entra en int32)."""
+    if nro in SIN_DATO:
+        return None
+    return _entero(nro, 9)
+
+
+# Bordes de tamaño (trabajadores): un solo np.digitize sirve para tiers y segmentos
+SIZE_EDGES = [10, 20, 50, 100, 500, 1000]
+TIER_NAMES = ['tier1', 'tier2', 'tier3', 'tier4', 'tier5']
+# código de tamaño + 1 → índice en TIER_NAMES (-1 = sin tier)
+_TIER_BY_SIZE = np.array([-1, -1, -1, 4, 3, 2, 1, 0])
+# código de tamaño + 1 → partición del dataset (misma tabla: tier o 'micro'; sin dato → 'sin_dato')
+_BUCKET_BY_SIZE = np.array(['sin_dato'] + [TIER_NAMES[t] if t >= 0 else 'micro' for t in _TIER_BY_SIZE[1:]],
+                           dtype=object)
+
+
+def nro_trab_array(batch: list[Registro]) -> np.ndarray:
+    """NroTrab_num de un lote como float64 (NaN = sin dato), la entrada de size_codes."""
+    return np.fromiter((np.nan if r.NroTrab_num is None else r.NroTrab_num for r in batch), np.float64, len(batch))
+
+
+def size_codes(nro) -> np.ndarray:
+    """
+    Código de tamaño vectorizado: 0 (<10), 1 (10-19), 2 (20-49), 3 (50-99),
+    4 (100-499), 5 (500-999), 6 (>=1000); -1 si no hay dato (NaN o negativo).
+    """
+    nro = np.asarray(nro, dtype=np.float64)
+    codes = np.digitize(nro, SIZE_EDGES)
+    codes[np.isnan(nro) | (nro < 0)] = -1
+    return codes
+
+
+def tier_codes(nro) -> np.ndarray:
+    """Índice en TIER_NAMES por empresa (tier1 >=1000 … tier5 20-49); -1 = sin tier."""
+    return _TIER_BY_SIZE[size_codes(nro) + 1]
+
+
+def tier_categorical(nro):
+    """tier1..tier5 como pandas.Categorical (NaN = sin tier), p.ej. para groupby."""
+    import pandas as pd
+
+    return pd.Categorical.from_codes(tier_codes(nro), TIER_NAMES)
+
+
+def size_buckets(nro) -> np.ndarray:
+    """Partición por tamaño del dataset, vectorizada: tier1..tier5, 'micro' (1-19) o 'sin_dato'."""
+    return _BUCKET_BY_SIZE[size_codes(nro) + 1]
+
+
+def _split(line: str) -> list[str]:
+    # El padrón no trae comillas; csv solo para las líneas raras que sí las tengan
+    if '"' in line:
+        return next(csv.reader([line]))
+    return line.split(',')
+
+
+def read_header(path: Path = PADRON) -> list[str]:
+    """Cabecera original del CSV (nombres largos de SUNAT)."""
+    with open(path, 'r', encoding='latin-1') as f:
+        return [c.strip() for c in f.readline().split(',')]
+
+
+def byte_ranges(path: Path = PADRON, parts: int = 1) -> list[tuple[int, int]]:
+    """Divide el archivo en `parts` rangos de bytes alineados a inicio de línea."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()  # avanzar hasta el próximo inicio de línea
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+# Jurídica = línea que empieza con '2'. Buscando "\n2" el motor de regex salta
+# en C las ~12M líneas de personas naturales sin crear objetos Python.
+_JURIDICA = re.compile(rb'\n(2[^\n]*)')
+_WINDOW = 8 * 1024 * 1024  # bytes del mmap procesados antes de liberar páginas
+
+
+def iter_batches(
+    path: Path = PADRON,
+    solo_activas: bool = False,
+    batch_size: int = BATCH_SIZE,
+    stats: Counter | None = None,
+    start: int = 0,
+    end: int | None = None,
+) -> Iterator[list[Registro]]:
+    """
+    Recorre el padrón (o el rango de bytes [start, end)) y entrega lotes de
+    personas jurídicas. Si se pasa `stats`, acumula ahí los contadores.
+
+    Escanea un mmap del archivo a nivel de bytes: las filas se descartan
+    (persona natural, no ACTIVO) antes de decodificar y solo las que
+    sobreviven se convierten a str.
+    """
+    if stats is None:
+        stats = Counter()
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        if end is None:
+            end = len(mm)
+        if start == 0:
+            start = mm.find(b'\n') + 1 or end  # saltar cabecera
+        if start >= end:
+            return
+
+        lineas = juridicas = malformadas = 0
+        batch = []
+        while start < end:
+            # Ventana alineada a fin de línea; al terminarla se sueltan sus páginas
+            # para que el RSS no crezca con el tamaño del archivo.
+            stop = mm.find(b'\n', min(start + _WINDOW, end) - 1, end) + 1 or end
+            lineas += mm[start:stop].count(b'\n')
+
+            # start siempre es inicio de línea: el '\n' previo ancla la búsqueda
+            for m in _JURIDICA.finditer(mm, start - 1, stop):
+                juridicas += 1
+                raw = m.group(1)
+
+                # Estado va tras la primera coma; se compara en bytes
+                comma = raw.find(b',')
+                activa = raw.startswith(b'ACTIVO,', comma + 1)
+                if solo_activas and not activa:
+                    stats['inactivas'] += 1
+                    continue
+
+                parts = _split(raw.decode('latin-1'))
+                if len(parts) < NUM_FIELDS:
+                    malformadas += 1
+                    continue
+                if activa:
+                    stats['activas'] += 1
+
+                parts = [p.strip() for p in parts[:NUM_FIELDS]]
+                batch.append(Registro(*parts, parse_nro_trab(parts[7])))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+            if hasattr(mm, 'madvise'):
+                page = start - start % mmap.PAGESIZE
+                mm.madvise(mmap.MADV_DONTNEED, page, stop - page)
+            start = stop
+
+        if end == len(mm) and mm[end - 1] != 0x0A:
+            lineas += 1  # última línea sin salto final
+
+        stats['lineas'] += lineas
+        stats['personas_naturales'] += lineas - juridicas
+        stats['juridicas'] += juridicas - malformadas
+        stats['malformadas'] += malformadas
+
+    if batch:
+        yield batch
+
+
+def _scan_range(path, start, end, consumers, solo_activas, batch_size):
+    """Worker de scan paralelo: procesa un rango y devuelve el estado parcial."""
+    stats = Counter()
+    for batch in iter_batches(path, solo_activas, batch_size, stats, start, end):
+        for consumer in consumers:
+            consumer.consume(batch)
+    return stats, [consumer.state() for consumer in consumers]
+
+
+def scan(path: Path = PADRON, consumers: Iterable = (), solo_activas: bool = False,
+         batch_size: int = BATCH_SIZE, progress: bool = True, workers: int = 1) -> Counter:
+    """
+    Una sola pasada sobre el padrón alimentando a todos los consumidores.
+    Cada consumidor implementa `consume(batch)` y `close()`.
+
+    Con workers > 1 el archivo se parte en rangos de bytes que se parsean en
+    un pool de procesos; cada worker recibe una copia de los consumidores y
+    su estado parcial se combina con `merge(state)` en orden de archivo, así
+    el resultado es idéntico al de la pasada serial.
+    Devuelve los contadores de la lectura.
+    """
+    consumers = list(consumers)
+    stats = Counter()
+
+    try:
+        if workers > 1:
+            for consumer in consumers:
+                if not hasattr(consumer, 'merge'):
+                    raise ValueError(f"{type(consumer).__name__} no soporta modo paralelo")
+
+            ranges = byte_ranges(path, workers)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_scan_range, path, start, end, consumers, solo_activas, batch_size)
+                    for start, end in ranges
+                ]
+                for i, future in enumerate(futures, 1):
+                    partial, states = future.result()
+                    stats.update(partial)
+                    for consumer, state in zip(consumers, states):
+                        consumer.merge(state)
+                    if progress:
+                        print(f"  ...rango {i}/{len(ranges)} | {stats['lineas']:,} líneas")
+        else:
+            leidos = 0
+            for batch in iter_batches(path, solo_activas, batch_size, stats):
+                for consumer in consumers:
+                    consumer.consume(batch)
+                leidos += len(batch)
+                if progress:
+                    print(f"  ...{leidos:,} jurídicas procesadas")
+    finally:
+        for consumer in consumers:
+            consumer.close()
+
+    return stats
+
+
+# ============================================================
+# Consumidores
+# ============================================================
+
+class TierCollector:
+    """Clasifica jurídicas ACTIVAS no procesadas en tier1..tier5."""
+
+    def __init__(self, exclude: RucSet | set | None = None):
+        if not isinstance(exclude, RucSet):
+            exclude = RucSet.from_iterable(exclude or ())
+        self.exclude = exclude
+        self.tiers = {name: [] for name in TIER_NAMES}
+        self.stats = Counter()
+
+    def consume(self, batch: list[Registro]):
+        n = len(batch)
+        activa = np.fromiter((r.Estado == 'ACTIVO' for r in batch), bool, n)
+        # Pertenencia de todo el lote en una sola búsqueda vectorizada
+        procesada = self.exclude.contains([r.RUC for r in batch])
+        nro = nro_trab_array(batch)
+        tier = tier_codes(nro)
+
+        pendiente = activa & ~procesada
+        sin_dato = np.isnan(nro)
+        self.stats['inactivas'] += int(n - activa.sum())
+        self.stats['ya_procesadas'] += int((activa & procesada).sum())
+        self.stats['sin_dato'] += int((pendiente & sin_dato).sum())
+        self.stats['muy_chicas'] += int((pendiente & ~sin_dato & (tier < 0)).sum())
+        for i, name in enumerate(TIER_NAMES):
+            self.tiers[name].extend(batch[j] for j in np.flatnonzero(pendiente & (tier == i)))
+
+    def state(self):
+        return self.tiers, self.stats
+
+    def merge(self, state):
+        tiers, stats = state
+        for name, rows in tiers.items():
+            self.tiers[name].extend(rows)
+        self.stats.update(stats)
+
+    def close(self):
+        from padron_pareto import order_desc
+
+        # Mayor número de trabajadores primero (counting sort estable)
+        for rows in self.tiers.values():
+            orden = order_desc(np.fromiter((r.NroTrab_num for r in rows), np.float64, len(rows)))
+            rows[:] = [rows[i] for i in orden]
+
+    def rows(self, *names: str) -> list[Registro]:
+        """Registros de varios tiers concatenados, en el orden dado."""
+        return [r for name in names for r in self.tiers[name]]
+
+    def sorted_rows(self) -> list[Registro]:
+        """tier1..tier5 concatenados: ya quedan en orden NroTrab desc (los tiers no se solapan)."""
+        return self.rows(*TIER_NAMES)
+
+
+# Columnas de baja cardinalidad → dictionary-encoded en el schema tipado
+CATEGORICAL_COLUMNS = [c for c in COLUMNS if c not in ('RUC', 'NroTrab')]
+
+
+def parquet_schema(typed: bool = False):
+    """
+    Schema del Parquet del padrón. Sin tipar todo es string (formato histórico);
+    tipado: RUC int64, NroTrab int32 nullable y el resto dictionary<int32, string>.
+    """
+    import pyarrow as pa
+
+    if not typed:
+        return pa.schema([(c, pa.string()) for c in COLUMNS])
+    types = {'RUC': pa.int64(), 'NroTrab': pa.int32()}
+    dict_type = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([(c, types.get(c, dict_type)) for c in COLUMNS])
+
+
+def batch_table(batch: list[Registro], typed: bool = False):
+    """
+    Lote de registros → pyarrow.Table con el schema de parquet_schema(typed).
+    En el schema tipado un RUC o NroTrab no numérico queda null en vez de
+    abortar la conversión (ver ParquetSink.ruc_invalidos).
+    """
+    import pyarrow as pa
+
+    arrays = []
+    for name, col in zip(COLUMNS, list(zip(*batch))[:NUM_FIELDS]):
+        # Campos vacíos → null (igual que pd.read_csv)
+        if not typed:
+            arrays.append(pa.array([v or None for v in col], type=pa.string()))
+        elif name == 'RUC':
+            arrays.append(pa.array([_entero(v, 18) for v in col], type=pa.int64()))
+        elif name == 'NroTrab':
+            arrays.append(pa.array([_entero(v, 9) for v in col], type=pa.int32()))
+        else:
+            arrays.append(pa.array([v or None for v in col], type=pa.string()).dictionary_encode())
+    return pa.Table.from_arrays(arrays, schema=parquet_schema(typed))
+
+
+class ParquetSink:
+    """
+    Escribe todas las jurídicas a Parquet, lote a lote.
+    typed=True usa el schema tipado de parquet_schema(); row_group_size agrupa
+    lotes hasta completar row groups de ese tamaño.
+    """
+
+    def __init__(self, output_file: Path, compression: str = 'snappy', typed: bool = False,
+                 row_group_size: int | None = None, compression_level: int | None = None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.output_file = Path(output_file)
+        self.typed = typed
+        self.row_group_size = row_group_size
+        self.schema = parquet_schema(typed)
+        self.writer = pq.ParquetWriter(self.output_file, self.schema, compression=compression,
+                                       compression_level=compression_level)
+        self.pending = []
+        self.pending_rows = 0
+        self.rows = 0
+        self.ruc_invalidos = 0  # solo typed: RUC no numérico escrito como null
+
+    def consume(self, batch: list[Registro]):
+        table = batch_table(batch, self.typed)
+        self.rows += len(batch)
+        self.ruc_invalidos += table['RUC'].null_count if self.typed else 0
+        if not self.row_group_size:
+            self.writer.write_table(table)
+            return
+
+        self.pending.append(table)
+        self.pending_rows += len(table)
+        if self.pending_rows >= self.row_group_size:
+            table = self._pa.concat_tables(self.pending)
+            full = len(table) - len(table) % self.row_group_size
+            self.writer.write_table(table.slice(0, full), row_group_size=self.row_group_size)
+            rest = table.slice(full)
+            self.pending = [rest] if len(rest) else []
+            self.pending_rows = len(rest)
+
+    def close(self):
+        if self.pending:
+            self.writer.write_table(self._pa.concat_tables(self.pending))
+            self.pending = []
+        self.writer.close()
+
+
+class DatasetSink:
+    """
+    Escribe las jurídicas como dataset Parquet particionado estilo Hive, lote a
+    lote (memoria acotada a un lote, igual que el resto de la pasada):
+        root/Estado=ACTIVO/tier=tier1/part-<lote>-0.parquet
+    Schema tipado de parquet_schema(True) + NroTrab_num (int32). Dentro de cada
+    archivo las filas van ordenadas por NroTrab_num desc, así las estadísticas
+    min/max de cada row group permiten saltar grupos completos al filtrar por
+    umbrales de trabajadores. Las particiones de una corrida anterior se borran
+    al abrir el sink.
+    """
+
+    def __init__(self, root: Path, compression: str = 'zstd', max_rows_per_group: int = 65_536):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        self._pa = pa
+        self._ds = ds
+        self.root = Path(root)
+        self.max_rows_per_group = max_rows_per_group
+        self.partitioning = ds.partitioning(
+            pa.schema([('Estado', pa.string()), ('tier', pa.string())]), flavor='hive')
+        self.file_options = ds.ParquetFileFormat().make_write_options(compression=compression)
+        self.batches = 0
+        self.rows = 0
+        for old in self.root.glob('Estado=*'):
+            shutil.rmtree(old)
+
+    def consume(self, batch: list[Registro]):
+        import pyarrow.compute as pc
+
+        pa = self._pa
+        table = batch_table(batch, typed=True)
+        # NroTrab conserva el texto original ('NO DISPONIBLE', ...) y NroTrab_num
+        # lleva el valor numérico para ordenar y para las estadísticas
+        nro = pa.array([r.NroTrab or None for r in batch], type=pa.string()).dictionary_encode()
+        table = table.set_column(COLUMNS.index('NroTrab'), 'NroTrab', nro)
+        table = table.append_column('NroTrab_num', pa.array([r.NroTrab_num for r in batch], type=pa.int32()))
+        tiers = pa.array(size_buckets(nro_trab_array(batch)), type=pa.string())
+        table = table.append_column('tier', tiers)
+
+        # Las columnas de partición van como string en la ruta
+        estado = table.schema.get_field_index('Estado')
+        table = table.set_column(estado, 'Estado', pc.cast(table['Estado'], pa.string()))
+        table = table.take(pc.array_sort_indices(table['NroTrab_num'], order='descending', null_placement='at_end'))
+
+        self._ds.write_dataset(
+            table,
+            self.root,
+            format='parquet',
+            partitioning=self.partitioning,
+            basename_template=f'part-{self.batches}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=self.file_options,
+            max_rows_per_group=self.max_rows_per_group,
+            use_threads=False,  # conserva el orden por NroTrab dentro de cada archivo
+        )
+        self.batches += 1
+        self.rows += len(batch)
+
+    def close(self):
+        pass
+
+
+def open_dataset(root: Path):
+    """Abre el dataset particionado escrito por DatasetSink (filtros con pushdown)."""
+    import pyarrow.dataset as ds
+
+    return ds.dataset(root, format='parquet', partitioning='hive')
+
+
+class StatsCollector:
+    """Distribuciones básicas (Estado, Tipo, NroTrab) de las jurídicas leídas."""
+
+    def __init__(self):
+        self.estado = Counter()
+        self.tipo = Counter()
+        self.nro_trab = Counter()
+
+    def consume(self, batch: list[Registro]):
+        for r in batch:
+            self.estado[r.Estado] += 1
+            if r.Estado == 'ACTIVO':
+                self.tipo[r.Tipo] += 1
+                self.nro_trab[r.NroTrab] += 1
+
+    def state(self):
+        return self.estado, self.tipo, self.nro_trab
+
+    def merge(self, state):
+        estado, tipo, nro_trab = state
+        self.estado.update(estado)
+        self.tipo.update(tipo)
+        self.nro_trab.update(nro_trab)
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# Helpers de E/S
+# ============================================================
+
+def load_existing_rucs(path: Path = EXISTING) -> RucSet:
+    """RUCs ya procesados (columna RUC de all_companies.csv), con cache .rucs.npy."""
+    return RucSet.cached(path)
+
+
+def write_tier_csv(path: Path, rows: Iterable[Registro], lineterminator: str = '\r\n') -> int:
+    """Exporta registros con las columnas que espera n8n (RazonSocial no viene en el padrón)."""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=lineterminator)
+        writer.writerow(TIER_FIELDS)
+        for r in rows:
+            writer.writerow([
+                r.RUC, '', r.Estado, r.Condicion, r.Tipo, r.Actividad_CIIU3_Principal,
+                r.NroTrab, r.NroTrab_num, r.Departamento, r.Provincia, r.Distrito,
+            ])
+            count += 1
+    return count
+
+
+# ============================================================
+# Refresh mensual: tiers + Parquet + estadísticas en una pasada
+# ============================================================
+
+def refresh():
+    print("=" * 60)
+    print("REFRESH PADRÓN RUC (una sola lectura)")
+    print("=" * 60)
+
+    existing = load_existing_rucs()
+    print(f"Ya procesados: {len(existing):,} RUCs")
+
+    tiers = TierCollector(exclude=existing)
+    parquet = ParquetSink(OUT_DIR / "padron_ruc_juridicas.parquet")
+    distribucion = StatsCollector()
+
+    print(f"Leyendo {PADRON}...")
+    stats = scan(PADRON, [tiers, parquet, distribucion])
+
+    print(f"\n{'=' * 60}")
+    print("RESULTADO")
+    print(f"{'=' * 60}")
+    print(f"Líneas leídas: {stats['lineas']:,}")
+    print(f"Jurídicas: {stats['juridicas']:,} (activas: {stats['activas']:,})")
+    print(f"Ya en DB: {tiers.stats['ya_procesadas']:,}")
+    print(f"Sin dato empleados: {tiers.stats['sin_dato']:,}")
+    print(f"Muy chicas (<20): {tiers.stats['muy_chicas']:,}")
+    for name, rows in tiers.tiers.items():
+        print(f"  {name}: {len(rows):,}")
+
+    print("\nEstado (jurídicas):")
+    for estado, n in distribucion.estado.most_common(10):
+        print(f"  {estado:<30} {n:,}")
+
+    # (archivo, filas, fin de línea) — mismos formatos que analyze_padron(_fast).py
+    outputs = [
+        ('tier4_50_99.csv', tiers.rows('tier4'), '\r\n'),
+        ('tier5_20_49.csv', tiers.rows('tier5'), '\r\n'),
+        ('tier123_new.csv', tiers.rows('tier1', 'tier2', 'tier3'), '\r\n'),
+        ('tier4_5_companies.csv', tiers.sorted_rows(), '\n'),
+    ]
+    print()
+    for name, rows, eol in outputs:
+        n = write_tier_csv(OUT_DIR / name, rows, lineterminator=eol)
+        print(f"Exportado: {OUT_DIR / name} ({n:,} filas)")
+
+    size_mb = os.path.getsize(parquet.output_file) / (1024 * 1024)
+    print(f"Exportado: {parquet.output_file} ({parquet.rows:,} filas, {size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    refresh()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Delta mensual del Padrón RUC contra el snapshot del mes anterior.
+
+En vez de re-tierizar todo el padrón contra all_companies.csv, cada mes se
+guarda un snapshot compacto de las jurídicas (RUC + hash del contenido +
+Estado/Condicion/NroTrab/tier) y el padrón nuevo se compara contra él:
+
+- delta_nuevas_YYYYMM.csv    RUCs que no estaban el mes anterior (formato tiers)
+- delta_bajas_YYYYMM.csv     RUCs que ya no aparecen
+- delta_cambios_YYYYMM.csv   RUCs cuyo contenido cambió (qué campos: Estado,
+                             Condicion, tier, otros)
+- delta_cola_YYYYMM.csv      cola de enriquecimiento: activas tier1-5 nuevas o
+                             con cambio de Estado/Condicion/tier (formato tiers)
+
+Uso:
+    python3 padron_delta.py                                   # PADRON vs último snapshot
+    python3 padron_delta.py /ruta/PadronRUC_202602.csv --workers 4
+    python3 padron_delta.py --anterior data/padron_snapshots/snapshot_202601.parquet
+
+Sin snapshot previo solo se guarda el del mes (primera corrida).
+"""
+
+import argparse
+import csv
+import re
+from collections import Counter
+from hashlib import blake2b
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from padron import (
+    NUM_FIELDS, OUT_DIR, PADRON, TIER_NAMES, Registro, nro_trab_array, scan, size_buckets, write_tier_csv,
+)
+from rucset import to_int64
+
+SNAPSHOT_DIR = OUT_DIR / "padron_snapshots"
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('RUC', pa.int64()),
+    ('hash', pa.int64()),
+    ('Estado', pa.dictionary(pa.int32(), pa.string())),
+    ('Condicion', pa.dictionary(pa.int32(), pa.string())),
+    ('NroTrab_num', pa.int32()),
+    ('tier', pa.dictionary(pa.int32(), pa.string())),
+])
+
+CAMBIOS_FIELDS = [
+    'RUC', 'cambios', 'Estado_ant', 'Estado', 'Condicion_ant', 'Condicion',
+    'NroTrab_ant', 'NroTrab_num', 'tier_ant', 'tier',
+]
+BAJAS_FIELDS = ['RUC', 'Estado_ant', 'Condicion_ant', 'NroTrab_ant', 'tier_ant']
+
+
+def content_hash(r: Registro) -> int:
+    """Hash de 64 bits de la fila, sin PERIODO_PUBLICACION (cambia todos los meses)."""
+    data = '\x1f'.join(r[:NUM_FIELDS - 1]).encode('utf-8')
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little', signed=True)
+
+
+def periodo_of(path: Path) -> str:
+    """YYYYMM del nombre (PadronRUC_202601.csv) o del PERIODO_PUBLICACION de la primera fila."""
+    m = re.search(r'(\d{6})', path.name)
+    if m:
+        return m.group(1)
+    with open(path, 'r', encoding='latin-1') as f:
+        f.readline()
+        return f.readline().rstrip('\r\n').split(',')[-1].strip()
+
+
+def previous_snapshot(periodo: str) -> Path | None:
+    """Snapshot más reciente anterior a `periodo`."""
+    anteriores = sorted(p for p in SNAPSHOT_DIR.glob('snapshot_*.parquet') if p.stem[-6:] < periodo)
+    return anteriores[-1] if anteriores else None
+
+
+class DeltaCollector:
+    """
+    Arma el snapshot del mes y, si hay snapshot anterior, separa al vuelo los
+    registros nuevos o con contenido distinto (lookup vectorizado por lote con
+    searchsorted sobre los RUC ordenados del mes anterior). Las filas con RUC
+    no numérico quedan fuera del snapshot y del delta (se cuentan en
+    `malformadas`).
+    """
+
+    def __init__(self, anterior: pa.Table | None = None):
+        self.anterior = anterior
+        if anterior is not None:
+            self.prev_ruc = anterior['RUC'].to_numpy()
+            self.prev_hash = anterior['hash'].to_numpy()
+        self.batches = []      # snapshot del mes, por lote
+        self.candidatos = []   # (Registro, índice en el anterior o -1)
+        self.malformadas = 0
+
+    def consume(self, batch: list[Registro]):
+        rucs = to_int64([r.RUC for r in batch])
+        validos = rucs >= 0
+        if not validos.all():
+            self.malformadas += int((~validos).sum())
+            batch = [r for r, ok in zip(batch, validos) if ok]
+            rucs = rucs[validos]
+        hashes = np.fromiter((content_hash(r) for r in batch), np.int64, len(batch))
+        self.batches.append(pa.record_batch([
+            pa.array(rucs),
+            pa.array(hashes),
+            pa.array([r.Estado for r in batch]).dictionary_encode(),
+            pa.array([r.Condicion for r in batch]).dictionary_encode(),
+            pa.array([r.NroTrab_num for r in batch], type=pa.int32()),
+            pa.array(size_buckets(nro_trab_array(batch)), type=pa.string()).dictionary_encode(),
+        ], schema=SNAPSHOT_SCHEMA))
+
+        if self.anterior is None:
+            return
+        idx = np.searchsorted(self.prev_ruc, rucs)
+        idx[idx == len(self.prev_ruc)] = 0
+        found = self.prev_ruc[idx] == rucs
+        distinto = ~found | (self.prev_hash[idx] != hashes)
+        for i in np.flatnonzero(distinto):
+            self.candidatos.append((batch[i], int(idx[i]) if found[i] else -1))
+
+    def state(self):
+        return self.batches, self.candidatos, self.malformadas
+
+    def merge(self, state):
+        batches, candidatos, malformadas = state
+        self.batches.extend(batches)
+        self.candidatos.extend(candidatos)
+        self.malformadas += malformadas
+
+    def close(self):
+        pass
+
+    def snapshot(self) -> pa.Table:
+        """Snapshot del mes ordenado por RUC (clave de búsqueda del mes siguiente)."""
+        table = pa.Table.from_batches(self.batches, schema=SNAPSHOT_SCHEMA)
+        return table.sort_by('RUC').unify_dictionaries().combine_chunks()
+
+
+def comparar(collector: DeltaCollector, snapshot: pa.Table):
+    """Separa nuevas / cambios / bajas y arma la cola de enriquecimiento."""
+    anterior = collector.anterior
+    prev = {
+        c: anterior[c].to_pylist() for c in ('Estado', 'Condicion', 'NroTrab_num', 'tier')
+    }
+
+    nuevas, cambios, cola = [], [], []
+    resumen = Counter()
+    tiers = size_buckets(nro_trab_array([r for r, _ in collector.candidatos]))
+    for (r, i), tier in zip(collector.candidatos, tiers):
+        encolar = False
+        if i < 0:
+            nuevas.append(r)
+            encolar = True
+        else:
+            campos = [
+                campo for campo, antes, ahora in (
+                    ('Estado', prev['Estado'][i], r.Estado),
+                    ('Condicion', prev['Condicion'][i], r.Condicion),
+                    ('tier', prev['tier'][i], tier),
+                ) if antes != ahora
+            ]
+            resumen.update(campos or ['otros'])
+            encolar = bool(campos)
+            cambios.append([
+                r.RUC, '|'.join(campos or ['otros']),
+                prev['Estado'][i], r.Estado, prev['Condicion'][i], r.Condicion,
+                prev['NroTrab_num'][i], r.NroTrab_num, prev['tier'][i], tier,
+            ])
+        if encolar and r.Estado == 'ACTIVO' and tier in TIER_NAMES:
+            cola.append(r)
+
+    # Bajas: RUCs del anterior que no aparecen en el snapshot nuevo (ninguno
+    # de los dos lados está deduplicado: sin assume_unique)
+    prev_ruc = collector.prev_ruc
+    bajas_idx = np.flatnonzero(~np.isin(prev_ruc, snapshot['RUC'].to_numpy()))
+    bajas = [
+        [str(prev_ruc[i]), prev['Estado'][i], prev['Condicion'][i], prev['NroTrab_num'][i], prev['tier'][i]]
+        for i in bajas_idx
+    ]
+
+    # Mayor número de trabajadores primero (orden estable)
+    cola.sort(key=lambda r: -r.NroTrab_num)
+    return nuevas, cambios, bajas, cola, resumen
+
+
+def write_rows(path: Path, header: list[str], rows: list[list]) -> int:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(['' if v is None else v for v in row] for row in rows)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta mensual del padrón RUC contra el snapshot anterior")
+    parser.add_argument("padron", nargs="?", type=Path, default=PADRON, help="Padrón nuevo (CSV de SUNAT)")
+    parser.add_argument("--anterior", type=Path, default=None,
+                        help="Snapshot a comparar (default: el más reciente anterior al periodo)")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para parsear el padrón")
+    args = parser.parse_args()
+
+    periodo = periodo_of(args.padron)
+    anterior_path = args.anterior or previous_snapshot(periodo)
+
+    print("=" * 60)
+    print(f"DELTA PADRÓN RUC {periodo}")
+    print("=" * 60)
+
+    anterior = None
+    if anterior_path is not None:
+        anterior = pq.read_table(anterior_path)
+        print(f"Snapshot anterior: {anterior_path} ({anterior.num_rows:,} jurídicas)")
+    else:
+        print("Sin snapshot anterior: solo se guarda el del mes")
+
+    collector = DeltaCollector(anterior)
+    print(f"Leyendo {args.padron}...")
+    stats = scan(args.padron, [collector], workers=args.workers)
+
+    snapshot = collector.snapshot()
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    snapshot_path = SNAPSHOT_DIR / f"snapshot_{periodo}.parquet"
+    pq.write_table(snapshot, snapshot_path, compression='zstd')
+    print(f"\nLíneas leídas: {stats['lineas']:,} | jurídicas: {snapshot.num_rows:,}")
+    malformadas = stats['malformadas'] + collector.malformadas
+    if malformadas:
+        print(f"Malformadas (descartadas): {malformadas:,} ({collector.malformadas:,} con RUC no numérico)")
+    print(f"Snapshot guardado: {snapshot_path}")
+
+    if anterior is None:
+        return
+
+    nuevas, cambios, bajas, cola, resumen = comparar(collector, snapshot)
+
+    print(f"\n{'=' * 60}")
+    print("DELTA")
+    print(f"{'=' * 60}")
+    print(f"Nuevas: {len(nuevas):,}")
+    print(f"Bajas: {len(bajas):,}")
+    print(f"Con cambios: {len(cambios):,}")
+    for campo in ('Estado', 'Condicion', 'tier', 'otros'):
+        print(f"  {campo}: {resumen[campo]:,}")
+    print(f"Cola de enriquecimiento (activas tier1-5): {len(cola):,}")
+
+    print()
+    outputs = [
+        (f"delta_nuevas_{periodo}.csv", lambda p: write_tier_csv(p, nuevas)),
+        (f"delta_cambios_{periodo}.csv", lambda p: write_rows(p, CAMBIOS_FIELDS, cambios)),
+        (f"delta_bajas_{periodo}.csv", lambda p: write_rows(p, BAJAS_FIELDS, bajas)),
+        (f"delta_cola_{periodo}.csv", lambda p: write_tier_csv(p, cola)),
+    ]
+    for name, write in outputs:
+        n = write(OUT_DIR / name)
+        print(f"Exportado: {OUT_DIR / name} ({n:,} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Motor Pareto por histograma para NroTrab (dominio entero pequeño).
+
+En vez de ordenar la tabla completa para sacar acumulados, se acumula un
+histograma trabajadores → empresas (np.bincount) lote a lote; de ahí salen
+en O(n) el corte del 80%, los conteos por tier, el umbral del top K y las
+estadísticas. Cuando hace falta el orden de las filas se usa un counting
+sort: cada valor se reemplaza por su rango denso descendente (uint16 en la
+práctica) y np.argsort estable sobre enteros chicos es radix sort.
+
+    hist = ParetoHistogram()
+    for chunk in chunks:
+        hist.update(chunk['NroTrab_num'])
+    k = hist.pareto_count(80)            # empresas que suman el 80%
+    orden = hist.order_desc(nums)        # permutación estable, mayor primero
+    top = TopN(50); top.push(nums, rows) # reporte top-N con heap, por lotes
+"""
+
+import heapq
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from padron import TIER_NAMES, size_codes, tier_codes
+
+
+def _as_counts(nro) -> np.ndarray:
+    """NroTrab de un lote → enteros >= 0 (los NaN / <= 0 no entran al histograma)."""
+    nro = np.asarray(nro, dtype=np.float64)
+    return nro[nro > 0].astype(np.int64)
+
+
+class ParetoHistogram:
+    """Histograma acumulable por lotes: counts[v] = empresas con v trabajadores."""
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, nro):
+        """Suma un lote de NroTrab (Series, array o lista; NaN y <= 0 se ignoran)."""
+        self._add(np.bincount(_as_counts(nro)))
+
+    def merge(self, other: 'ParetoHistogram'):
+        self._add(other.counts)
+
+    def _add(self, counts: np.ndarray):
+        if len(counts) > len(self.counts):
+            self.counts = np.pad(self.counts, (0, len(counts) - len(self.counts)))
+        self.counts[:len(counts)] += counts
+
+    @property
+    def n(self) -> int:
+        """Empresas con trabajadores."""
+        return int(self.counts.sum())
+
+    @property
+    def total(self) -> int:
+        """Trabajadores sumados."""
+        return int(np.dot(np.arange(len(self.counts)), self.counts))
+
+    def desc(self) -> tuple[np.ndarray, np.ndarray]:
+        """(valores, empresas) de los valores presentes, de mayor a menor."""
+        values = np.flatnonzero(self.counts)[::-1]
+        return values, self.counts[values]
+
+    def pareto_count(self, porcentaje: int = 80) -> int:
+        """
+        Empresas del prefijo (orden desc) cuyo acumulado de trabajadores no
+        supera `porcentaje`% del total — lo mismo que filtrar
+        porcentaje_trab_acum <= porcentaje sobre la tabla ordenada.
+        """
+        values, counts = self.desc()
+        limite = porcentaje * self.total  # comparación entera: acum * 100 <= limite
+        acum = np.cumsum(values * counts)
+        antes = acum - values * counts
+        completos = acum * 100 <= limite
+        # Grupos enteros hasta el primero que no entra; de ese, las filas que caben
+        j = len(values) if completos.all() else int(np.argmin(completos))
+        k = int(counts[:j].sum())
+        if j < len(values) and antes[j] * 100 <= limite:
+            k += min(int(counts[j]), int((limite - antes[j] * 100) // (values[j] * 100)))
+        return k
+
+    def value_at_rank(self, k: int) -> int:
+        """Trabajadores de la empresa en la posición k (0 = la más grande)."""
+        values, counts = self.desc()
+        return int(values[np.searchsorted(np.cumsum(counts), k, side='right')])
+
+    def tier_counts(self) -> dict[str, int]:
+        """Empresas por tier1..tier5 (mismo criterio que padron.tier_codes)."""
+        values = np.flatnonzero(self.counts)
+        por_tier = np.bincount(tier_codes(values) + 1, weights=self.counts[values], minlength=len(TIER_NAMES) + 1)
+        return {name: int(c) for name, c in zip(TIER_NAMES, por_tier[1:])}
+
+    def size_counts(self) -> np.ndarray:
+        """Empresas por código de tamaño (padron.size_codes: 0 <10 … 6 >=1000)."""
+        values = np.flatnonzero(self.counts)
+        return np.bincount(size_codes(values), weights=self.counts[values], minlength=7).astype(np.int64)
+
+    def describe(self, name: str = 'NroTrab_num') -> pd.Series:
+        """Equivalente a Series.describe() sobre las empresas del histograma."""
+        values = np.flatnonzero(self.counts)
+        counts = self.counts[values]
+        n = self.n
+        mean = self.total / n
+        std = float(np.sqrt(np.dot(counts, (values - mean) ** 2) / (n - 1))) if n > 1 else float('nan')
+        acum = np.cumsum(counts)
+
+        def quantile(q):
+            # Interpolación lineal, igual que pandas
+            pos = q * (n - 1)
+            lo, hi = np.searchsorted(acum, [np.floor(pos), np.ceil(pos)], side='right')
+            return values[lo] + (values[hi] - values[lo]) * (pos - np.floor(pos))
+
+        return pd.Series(
+            [n, mean, std, values[0], quantile(0.25), quantile(0.5), quantile(0.75), values[-1]],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            name=name, dtype='float64',
+        )
+
+    def order_desc(self, nro) -> np.ndarray:
+        """Permutación estable (mayor NroTrab primero) de un lote cuyos valores están en el histograma."""
+        return order_desc(nro, self.counts)
+
+
+def order_desc(nro, counts: np.ndarray | None = None) -> np.ndarray:
+    """
+    Counting sort estable, descendente: cada valor pasa a su rango denso
+    (0 = el mayor) y argsort estable sobre uint16/uint32 usa radix sort.
+    Los NaN / <= 0 van al final, en su orden original.
+    """
+    nro = np.asarray(nro, dtype=np.float64)
+    validos = nro > 0
+    enteros = np.where(validos, nro, 0).astype(np.int64)
+    if counts is None:
+        counts = np.bincount(enteros[validos]) if validos.any() else np.zeros(1, dtype=np.int64)
+    presentes = counts > 0
+    # rango[v] = cuántos valores presentes hay por encima de v
+    rango = np.cumsum(presentes[::-1])[::-1] - presentes
+    sin_dato = int(presentes.sum())
+    dtype = np.uint16 if sin_dato < np.iinfo(np.uint16).max else np.uint32
+    keys = np.where(validos, rango[np.minimum(enteros, len(rango) - 1)], sin_dato).astype(dtype)
+    return np.argsort(keys, kind='stable')
+
+
+class TopN:
+    """Top-N por NroTrab sobre lotes, con min-heap (empates: el primero en llegar gana)."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.heap = []   # (valor, -secuencia, fila)
+        self.seq = 0
+
+    def push(self, nro, rows: Sequence):
+        nro = np.asarray(nro, dtype=np.float64)
+        candidatos = np.flatnonzero(nro > 0)
+        if len(candidatos) > self.n:
+            # Solo los n mayores del lote pueden entrar (np.partition, O(n))
+            corte = np.partition(nro[candidatos], len(candidatos) - self.n)[len(candidatos) - self.n]
+            candidatos = candidatos[nro[candidatos] >= corte]
+        for i in candidatos:
+            item = (nro[i], -(self.seq + int(i)), rows[i])
+            if len(self.heap) < self.n:
+                heapq.heappush(self.heap, item)
+            elif item[:2] > self.heap[0][:2]:
+                heapq.heapreplace(self.heap, item)
+        self.seq += len(nro)
+
+    def rows(self) -> list:
+        """Filas del top, mayor primero."""
+        return [row for _, _, row in sorted(self.heap, key=lambda item: item[:2], reverse=True)]
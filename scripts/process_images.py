@@ -4,88 +4,42 @@ Process ALL avatar and work images from /home/jimmy/Descargas/empliq/
 - Avatars: Split grids, remove backgrounds, clean artifacts
 - Work: Crop excess white space, make transparent
 Output: website/public/illustrations/avatars and /work
+
+With --workers N, files and avatar sheets run in a process pool (default:
+serial); output names are planned before anything is written, so the result
+does not depend on the number of workers.
+
+Usage:
+    python3 process_images.py [--workers 8] [--force] [--src-avatars DIR] [--src-work DIR] [--out DIR]
+
+Each output dir keeps a .process_images_cache.json: sources whose content and
+parameters did not change since the last run are skipped, and outputs no
+source produces anymore are removed. --force rebuilds everything.
+
+Next to every PNG go responsive copies (<name>-<width>.avif/.webp: 64-512px
+for avatars, 400-1200px for work), and each output dir gets a manifest.json:
+{"avatar_x": {"src", "width", "height", "bytes",
+"variants": [{"src", "format", "width", "height", "bytes"}, ...]}}.
+The website does not read manifest.json yet (pages still use the PNGs
+through next/image); it is there for a future <picture>/srcset integration.
 """
 
-import os
-import sys
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from PIL import Image, ImageFilter
+from typing import Iterator
+from PIL import Image, features
 import numpy as np
 
+from image_ops import remove_background
+
 # ============================================================
 # Shared utilities
 # ============================================================
 
-def remove_white_background(img: Image.Image, threshold: int = 235) -> Image.Image:
-    """Remove white/near-white background and make transparent."""
-    img = img.convert("RGBA")
-    data = np.array(img)
-    
-    r, g, b, a = data[:,:,0], data[:,:,1], data[:,:,2], data[:,:,3]
-    
-    # Pure white mask
-    white_mask = (r >= threshold) & (g >= threshold) & (b >= threshold)
-    data[white_mask, 3] = 0
-    
-    # Near-white anti-alias (smooth edge transition)
-    near_threshold = threshold - 40
-    near_white = (r >= near_threshold) & (g >= near_threshold) & (b >= near_threshold) & ~white_mask
-    if np.any(near_white):
-        avg = (r[near_white].astype(float) + g[near_white].astype(float) + b[near_white].astype(float)) / 3
-        alpha_factor = np.clip(1.0 - (avg - near_threshold) / (threshold - near_threshold), 0, 1)
-        data[near_white, 3] = (alpha_factor * 255).astype(np.uint8)
-    
-    return Image.fromarray(data)
-
-
-def remove_light_background(img: Image.Image, threshold: int = 240) -> Image.Image:
-    """Remove light gray/white background for grayscale images."""
-    img = img.convert("RGBA")
-    data = np.array(img)
-    
-    r, g, b = data[:,:,0], data[:,:,1], data[:,:,2]
-    brightness = (r.astype(float) + g.astype(float) + b.astype(float)) / 3
-    
-    # Full transparent for very light pixels
-    light_mask = brightness >= threshold
-    data[light_mask, 3] = 0
-    
-    # Gradual for near-light
-    near_threshold = threshold - 30
-    near_light = (brightness >= near_threshold) & (brightness < threshold)
-    if np.any(near_light):
-        alpha = np.clip((threshold - brightness[near_light]) / (threshold - near_threshold) * 255, 0, 255)
-        data[near_light, 3] = alpha.astype(np.uint8)
-    
-    return Image.fromarray(data)
-
-
-def trim_transparent(img: Image.Image, padding: int = 8) -> Image.Image:
-    """Crop transparent areas around content."""
-    data = np.array(img)
-    if data.shape[2] < 4:
-        return img
-    alpha = data[:, :, 3]
-    
-    rows = np.any(alpha > 10, axis=1)
-    cols = np.any(alpha > 10, axis=0)
-    
-    if not rows.any() or not cols.any():
-        return img
-    
-    top = np.argmax(rows)
-    bottom = len(rows) - np.argmax(rows[::-1])
-    left = np.argmax(cols)
-    right = len(cols) - np.argmax(cols[::-1])
-    
-    top = max(0, top - padding)
-    bottom = min(img.height, bottom + padding)
-    left = max(0, left - padding)
-    right = min(img.width, right + padding)
-    
-    return img.crop((left, top, right, bottom))
-
-
 def auto_crop_white(img: Image.Image, threshold: int = 245, padding: int = 10) -> Image.Image:
     """Auto-crop excess white space from borders without making transparent."""
     gray = np.array(img.convert("L"))
@@ -123,40 +77,54 @@ def fit_to_square(img: Image.Image, size: int = 512) -> Image.Image:
     return canvas
 
 
-def detect_and_split_grid(img: Image.Image, min_cells: int = 2) -> list[Image.Image]:
+def find_separators(is_white: np.ndarray, min_gap: int = 15) -> list[tuple[int, int]]:
+    """Separator bands: runs of consecutive white rows/cols, [start, end), at least min_gap long."""
+    edges = np.diff(is_white.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = ends - starts >= min_gap
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def grid_counter(mask: np.ndarray, row_ranges: list[tuple], col_ranges: list[tuple]):
     """
-    Intelligently detect if an image is a grid of separate illustrations.
-    Returns a list of cropped cell images, or [img] if not a grid.
+    count(r0, r1, c0, c1) → True pixels of mask in that cell, for cells bounded
+    by the given ranges. Uses a summed-area table sampled only on the grid
+    lines (counts per band between lines, then cumsum), so it stays tiny.
     """
-    gray = np.array(img.convert("L"))
+    ys = sorted({0, mask.shape[0]} | {y for r in row_ranges for y in r})
+    xs = sorted({0, mask.shape[1]} | {x for c in col_ranges for x in c})
+    bands = np.stack([np.count_nonzero(mask[y0:y1], axis=0) for y0, y1 in zip(ys, ys[1:])])
+    blocks = np.add.reduceat(bands, xs[:-1], axis=1)
+    sat = np.zeros((len(ys), len(xs)), dtype=np.int64)
+    sat[1:, 1:] = blocks.cumsum(axis=0).cumsum(axis=1)
+    iy = {y: i for i, y in enumerate(ys)}
+    ix = {x: i for i, x in enumerate(xs)}
+
+    def count(r0, r1, c0, c1) -> int:
+        y0, y1, x0, x1 = iy[r0], iy[r1], ix[c0], ix[c1]
+        return int(sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0])
+
+    return count
+
+
+def detect_grid_boxes(img: Image.Image, min_cells: int = 2) -> tuple[list[tuple] | None, tuple[int, int]]:
+    """
+    Crop boxes (left, top, right, bottom) of the grid cells with content, or
+    None if the image is not a grid; plus the detected (cols, rows).
+    """
+    gray = np.asarray(img.convert("L"))
     h, w = gray.shape
     
-    # Find rows and columns that are mostly white (potential separators)
-    row_means = np.mean(gray, axis=1)
-    col_means = np.mean(gray, axis=0)
+    # Find rows and columns that are mostly white (potential separators):
+    # mean >= 248, compared as exact integer sums
+    row_sums = gray.sum(axis=1, dtype=np.uint32)
+    col_sums = gray.sum(axis=0, dtype=np.uint32)
     
     sep_threshold = 248
     
-    # Find separator bands (consecutive white rows/cols)
-    def find_separators(means, min_gap=15):
-        is_white = means >= sep_threshold
-        separators = []
-        in_sep = False
-        start = 0
-        for i, white in enumerate(is_white):
-            if white and not in_sep:
-                in_sep = True
-                start = i
-            elif not white and in_sep:
-                if i - start >= min_gap:
-                    separators.append((start, i))
-                in_sep = False
-        if in_sep and len(means) - start >= min_gap:
-            separators.append((start, len(means)))
-        return separators
-    
-    row_seps = find_separators(row_means, min_gap=max(10, h // 40))
-    col_seps = find_separators(col_means, min_gap=max(10, w // 40))
+    row_seps = find_separators(row_sums >= sep_threshold * w, min_gap=max(10, h // 40))
+    col_seps = find_separators(col_sums >= sep_threshold * h, min_gap=max(10, w // 40))
     
     # Determine grid boundaries
     def get_ranges(seps, total_size):
@@ -177,156 +145,385 @@ def detect_and_split_grid(img: Image.Image, min_cells: int = 2) -> list[Image.Im
     num_cols = len(col_ranges)
     
     if num_rows < min_cells and num_cols < min_cells:
-        return [img]  # Not a grid
-    
-    print(f"    Detected grid: {num_cols}x{num_rows} = {num_cols * num_rows} cells")
+        return None, (num_cols, num_rows)  # Not a grid
     
-    cells = []
+    # Dark pixels per cell from the grayscale array already in memory
+    count = grid_counter(gray < 230, row_ranges, col_ranges)
+    boxes = []
     for r_start, r_end in row_ranges:
         for c_start, c_end in col_ranges:
-            cell = img.crop((c_start, r_start, c_end, r_end))
             # Check if cell has actual content (not mostly white)
-            cell_gray = np.array(cell.convert("L"))
-            content_ratio = np.sum(cell_gray < 230) / cell_gray.size
+            content_ratio = count(r_start, r_end, c_start, c_end) / ((r_end - r_start) * (c_end - c_start))
             if content_ratio > 0.02:  # at least 2% non-white pixels
-                cells.append(cell)
+                boxes.append((c_start, r_start, c_end, r_end))
     
-    return cells if len(cells) >= min_cells else [img]
+    return (boxes if len(boxes) >= min_cells else None), (num_cols, num_rows)
+
+
+# ============================================================
+# Jobs (run in worker processes)
+# ============================================================
+# Workers get paths + crop boxes, never pixels, and return small dicts that
+# the main process prints in input order (an avatar sheet is decoded once per
+# job and split into all its cells there). Output names are planned up front
+# (deterministic, same as a serial run), so --workers only changes timing.
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.avif', '.webp')
+
+# Responsive copies next to each PNG: <name>-<width>.<format>, for every width
+# below the image's own plus the full width. AVIF needs Pillow >= 11.2 (or
+# pillow-avif-plugin); without it only WebP is written (reported in main).
+VARIANT_FORMATS = [fmt for fmt in ("avif", "webp") if features.check(fmt)]
+# Fixed encoder effort: AVIF speed 8 is ~2.5x faster than the default (6) for
+# ~6% larger files; WebP method 4 is libwebp's default (6 is ~100x slower)
+ENCODER_OPTIONS = {"avif": {"quality": 60, "speed": 8}, "webp": {"quality": 80, "method": 4}}
+
+# Every knob that changes the output; part of the cache key (see OutputCache)
+AVATAR_PARAMS = {"threshold": 232, "padding": 5, "size": 512, "min_size": 20, "min_cells": 2,
+                 "widths": [64, 128, 256, 512], "formats": VARIANT_FORMATS, "encoder": ENCODER_OPTIONS}
+WORK_PARAMS = {"crop_threshold": 245, "gray_threshold": 238, "threshold": 232, "padding": 5,
+               "min_size": 50, "max_dim": 1200,
+               "widths": [400, 800, 1200], "formats": VARIANT_FORMATS, "encoder": ENCODER_OPTIONS}
+
+
+def source_images(src_dir: str) -> list[Path]:
+    return [f for f in sorted(Path(src_dir).iterdir()) if f.suffix.lower() in IMAGE_SUFFIXES]
+
+
+def run_jobs(fn, jobs: list[tuple], workers: int = 1) -> Iterator:
+    """fn(*job) for every job, results in job order; workers > 1 fans out to a process pool."""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield fn(*job)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        yield from pool.map(fn, *zip(*jobs))
+
+
+def save_outputs(img: Image.Image, out_path: Path, params: dict) -> dict:
+    """
+    Save the PNG and its responsive WebP/AVIF copies; returns the manifest
+    entry: {src, width, height, bytes, variants: [{src, format, width, height, bytes}]}.
+    """
+    img.save(out_path, "PNG", optimize=True)
+    entry = {"src": out_path.name, "width": img.width, "height": img.height,
+             "bytes": out_path.stat().st_size, "variants": []}
+    for width in sorted({w for w in params["widths"] if w < img.width} | {img.width}):
+        height = max(1, round(img.height * width / img.width))
+        copy = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in params["formats"]:
+            path = out_path.with_name(f"{out_path.stem}-{width}.{fmt}")
+            copy.save(path, fmt.upper(), **params["encoder"][fmt])
+            entry["variants"].append({"src": path.name, "format": fmt, "width": copy.width,
+                                      "height": copy.height, "bytes": path.stat().st_size})
+    return entry
+
+
+def saved(out_path: Path, entry: dict, log: list[str]) -> dict:
+    """Job result for a written image (PNG + variants)."""
+    log.append(f"✅ Saved: {out_path.name} ({entry['width']}x{entry['height']}) + {len(entry['variants'])} variants")
+    return {"name": out_path.name, "saved": True, "image": entry, "log": log,
+            "bytes": entry["bytes"] + sum(v["bytes"] for v in entry["variants"])}
+
+
+def grid_job(path: Path, params: dict) -> dict:
+    """Avatar stage 1: size, mode and grid cells of a source file."""
+    img = Image.open(path)
+    boxes, grid = detect_grid_boxes(img, params["min_cells"])
+    return {"size": img.size, "mode": img.mode, "boxes": boxes, "grid": grid}
+
+
+def avatar_job(path: Path, cells: list[tuple[tuple | None, Path]], params: dict) -> list[dict]:
+    """Avatar stage 2: decode the file once, then every (box, out_path) cell of it."""
+    img = Image.open(path)
+    img.load()
+    return [avatar_cell(img.crop(box) if box else img, out_path, params) for box, out_path in cells]
+
+
+def avatar_cell(cell: Image.Image, out_path: Path, params: dict) -> dict:
+    """One cell (or the whole file) → square transparent PNG."""
+    # Remove white background + trim transparent edges (one pass, see image_ops)
+    trimmed = remove_background(cell, params["threshold"], band=40, padding=params["padding"])
+
+    if trimmed.width < params["min_size"] or trimmed.height < params["min_size"]:
+        return {"name": out_path.name, "saved": False, "bytes": 0,
+                "log": [f"Skipping tiny cell {out_path.name} ({trimmed.width}x{trimmed.height})"]}
+
+    # Fit to square
+    final = fit_to_square(trimmed, size=params["size"])
+    return saved(out_path, save_outputs(final, out_path, params), [])
+
+
+def work_job(path: Path, out_path: Path, params: dict) -> dict:
+    """Crop, make transparent and downscale (max_dim) one work illustration."""
+    img = Image.open(path)
+    log = [f"Size: {img.size[0]}x{img.size[1]}, Mode: {img.mode}"]
+
+    # First, auto-crop excess white borders
+    cropped = auto_crop_white(img, threshold=params["crop_threshold"], padding=params["padding"])
+    log.append(f"After crop: {cropped.width}x{cropped.height}")
+
+    # Remove white background → transparent, and trim any remaining transparent edges
+    if img.mode == 'L':
+        # Grayscale image
+        trimmed = remove_background(cropped, params["gray_threshold"], band=30, padding=params["padding"], light=True)
+    else:
+        trimmed = remove_background(cropped, params["threshold"], band=40, padding=params["padding"])
+
+    if trimmed.width < params["min_size"] or trimmed.height < params["min_size"]:
+        log.append("Skipping (too small after trim)")
+        return {"name": out_path.name, "saved": False, "bytes": 0, "log": log}
+
+    # For very large images, resize to reasonable web size
+    max_dim = params["max_dim"]
+    if trimmed.width > max_dim or trimmed.height > max_dim:
+        ratio = min(max_dim / trimmed.width, max_dim / trimmed.height)
+        new_w = int(trimmed.width * ratio)
+        new_h = int(trimmed.height * ratio)
+        trimmed = trimmed.resize((new_w, new_h), Image.Resampling.LANCZOS)
+        log.append(f"Resized to: {new_w}x{new_h}")
+
+    return saved(out_path, save_outputs(trimmed, out_path, params), log)
+
+
+# ============================================================
+# Output cache
+# ============================================================
+# Bump when a change in the code (not in *_PARAMS) changes the output
+PIPELINE_VERSION = 3
+CACHE_FILE = ".process_images_cache.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_files(images: dict) -> list[str]:
+    """Every file of a {name: manifest entry} dict (PNGs + variants)."""
+    return [f for entry in images.values() for f in [entry["src"]] + [v["src"] for v in entry["variants"]]]
+
+
+def write_json(path: Path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=1, sort_keys=True))
+    tmp.replace(path)
+
+
+class OutputCache:
+    """
+    Manifest in the output dir: source file → (content hash, params hash,
+    images it produced). A source whose hash and params match and whose
+    files all still exist is skipped; files that no source produces anymore
+    are deleted (only files listed in the manifest, never others).
+    """
+
+    def __init__(self, out_dir: Path, params: dict, force: bool = False):
+        self.out_dir = out_dir
+        self.path = out_dir / CACHE_FILE
+        key = json.dumps({"version": PIPELINE_VERSION, **params}, sort_keys=True)
+        self.params = hashlib.sha256(key.encode()).hexdigest()[:16]
+        self.force = force
+        try:
+            self.old = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.old = {}
+        self.new = {}
+
+    def fresh(self, source: Path, digest: str) -> dict | None:
+        """Cached {name: manifest entry} of an up-to-date source, or None if it has to be processed."""
+        entry = self.old.get(source.name)
+        if self.force or not entry or entry["hash"] != digest or entry["params"] != self.params:
+            return None
+        if not all((self.out_dir / name).exists() for name in image_files(entry["images"])):
+            return None
+        return entry["images"]
+
+    def record(self, source: Path, digest: str, images: dict):
+        self.new[source.name] = {"hash": digest, "params": self.params, "images": images}
+
+    def remove_stale(self) -> list[str]:
+        current = {name for entry in self.new.values() for name in image_files(entry["images"])}
+        old = {name for entry in self.old.values() for name in image_files(entry["images"])}
+        stale = sorted(old - current)
+        for name in stale:
+            (self.out_dir / name).unlink(missing_ok=True)
+        return stale
+
+    def save(self):
+        write_json(self.path, self.new)
+        # Manifest for the website (not consumed yet): image stem → PNG + responsive variants
+        write_json(self.out_dir / MANIFEST_FILE, {
+            Path(name).stem: image
+            for entry in self.new.values() for name, image in entry["images"].items()
+        })
 
 
 # ============================================================
 # Main processing
 # ============================================================
 
-def process_avatars(src_dir: str, out_dir: str):
-    """Process all avatar images."""
-    src = Path(src_dir)
+def avatar_stem(f: Path) -> str:
+    return f.stem.replace(" ", "_").replace("-", "_")
+
+
+def work_stem(f: Path) -> str:
+    stem = f.stem
+    # Shorten very long freepik-style names
+    if len(stem) > 40:
+        # Take first meaningful part
+        parts = stem.split("_")
+        stem = "_".join(parts[:5])
+    return stem.replace(" ", "_").replace("-", "_")
+
+
+def plan_outputs(outputs: list[tuple[str, Path, tuple | None]]) -> dict[str, tuple[Path, tuple | None]]:
+    """
+    (name, source, job) in source order → {name: (source, job)} with unique
+    names; job is None for outputs that are already up to date. When two
+    sources map to the same name the later one wins, as it did when files
+    were written one after another (overwriting).
+    """
+    planned = {}
+    for name, source, job in outputs:
+        if name in planned and planned[name][0] != source:
+            print(f"    ⚠️  {name}: {source.name} overrides {planned[name][0].name}")
+        planned[name] = (source, job)
+    return planned
+
+
+def finish(label: str, cache: OutputCache, digests: dict, cached: dict, planned: dict, results: list[dict],
+           started: float) -> int:
+    """Record what each source produced, drop stale files, write the manifests, print the summary."""
+    written = {r["name"]: r["image"] for r in results if r["saved"]}
+    images = {f: {} for f in digests}
+    for name, (source, job) in planned.items():
+        if job is None:
+            images[source][name] = cached[source][name]
+        elif name in written:
+            images[source][name] = written[name]
+    for f, digest in digests.items():
+        cache.record(f, digest, images[f])
+    stale = cache.remove_stale()
+    cache.save()
+
+    size_mb = sum(r["bytes"] for r in results if r["saved"]) / 1024 / 1024
+    total = sum(len(names) for names in images.values())
+    print(f"\n  Total {label}: {total} ({len(written)} written, {total - len(written)} up to date, "
+          f"{len(results) - len(written)} skipped, {len(stale)} stale files removed, "
+          f"{size_mb:.1f} MB, {time.perf_counter() - started:.1f}s)")
+    return total
+
+
+def process_avatars(src_dir: str, out_dir: str, workers: int = 1, force: bool = False):
+    """Process all avatar images (one job per file, in parallel with workers > 1)."""
+    started = time.perf_counter()
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
-    
-    avatar_count = 0
-    
-    for f in sorted(src.iterdir()):
-        if f.suffix.lower() not in ('.jpg', '.jpeg', '.png', '.avif', '.webp'):
+    cache = OutputCache(out, AVATAR_PARAMS, force)
+    digests = {f: file_hash(f) for f in source_images(src_dir)}
+    cached = {f: cache.fresh(f, digest) for f, digest in digests.items()}
+    todo = [f for f, images in cached.items() if images is None]
+
+    # Stage 1: size + grid detection per changed file
+    outputs = []
+    grids = dict(zip(todo, run_jobs(grid_job, [(f, AVATAR_PARAMS) for f in todo], workers)))
+    for f in digests:
+        if f not in grids:
+            outputs += [(name, f, None) for name in cached[f]]
             continue
-        
+        info = grids[f]
         print(f"\n  Processing avatar: {f.name}")
-        img = Image.open(f)
-        print(f"    Size: {img.size[0]}x{img.size[1]}, Mode: {img.mode}")
-        
-        # Try to detect and split grids
-        cells = detect_and_split_grid(img)
-        
-        for i, cell in enumerate(cells):
-            # Remove white background
-            transparent = remove_white_background(cell, threshold=232)
-            
-            # Trim transparent edges
-            trimmed = trim_transparent(transparent, padding=5)
-            
-            if trimmed.width < 20 or trimmed.height < 20:
-                print(f"    Skipping tiny cell {i+1} ({trimmed.width}x{trimmed.height})")
-                continue
-            
-            # Clean small isolated artifacts
-            # (optional: use morphological ops)
-            
-            # Fit to square
-            final = fit_to_square(trimmed, size=512)
-            
-            stem = f.stem.replace(" ", "_").replace("-", "_")
-            if len(cells) > 1:
-                name = f"avatar_{stem}_{i+1:02d}.png"
-            else:
-                name = f"avatar_{stem}.png"
-            
-            out_path = out / name
-            final.save(out_path, "PNG", optimize=True)
-            avatar_count += 1
-            print(f"    ✅ Saved: {name} ({final.width}x{final.height})")
-    
-    print(f"\n  Total avatars: {avatar_count}")
-    return avatar_count
+        print(f"    Size: {info['size'][0]}x{info['size'][1]}, Mode: {info['mode']}")
+        num_cols, num_rows = info["grid"]
+        if max(num_cols, num_rows) >= AVATAR_PARAMS["min_cells"]:
+            print(f"    Detected grid: {num_cols}x{num_rows} = {num_cols * num_rows} cells")
+
+        stem = avatar_stem(f)
+        if info["boxes"] is None:
+            outputs.append((f"avatar_{stem}.png", f, (f, None)))
+        else:
+            outputs += [(f"avatar_{stem}_{i + 1:02d}.png", f, (f, box)) for i, box in enumerate(info["boxes"])]
+
+    # Stage 2: one job per file, with all of its planned cells
+    print()
+    planned = plan_outputs(outputs)
+    cells = {}
+    for name, (_, job) in planned.items():
+        if job:
+            f, box = job
+            cells.setdefault(f, []).append((box, out / name))
+    jobs = [(f, file_cells, AVATAR_PARAMS) for f, file_cells in cells.items()]
+    results = []
+    for file_results in run_jobs(avatar_job, jobs, workers):
+        for result in file_results:
+            for line in result["log"]:
+                print(f"    {line}")
+            results.append(result)
 
+    return finish("avatars", cache, digests, cached, planned, results, started)
 
-def process_work(src_dir: str, out_dir: str):
-    """Process all work/illustration images."""
-    src = Path(src_dir)
+
+def process_work(src_dir: str, out_dir: str, workers: int = 1, force: bool = False):
+    """Process all work/illustration images (one job per file)."""
+    started = time.perf_counter()
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
-    
-    work_count = 0
-    
-    for f in sorted(src.iterdir()):
-        if f.suffix.lower() not in ('.jpg', '.jpeg', '.png', '.avif', '.webp'):
-            continue
-        
-        print(f"\n  Processing work: {f.name}")
-        img = Image.open(f)
-        print(f"    Size: {img.size[0]}x{img.size[1]}, Mode: {img.mode}")
-        
-        # First, auto-crop excess white borders
-        cropped = auto_crop_white(img, threshold=245, padding=5)
-        print(f"    After crop: {cropped.width}x{cropped.height}")
-        
-        # Remove white background → transparent
-        if img.mode == 'L':
-            # Grayscale image
-            transparent = remove_light_background(cropped, threshold=238)
+    cache = OutputCache(out, WORK_PARAMS, force)
+    digests = {f: file_hash(f) for f in source_images(src_dir)}
+    cached = {f: cache.fresh(f, digest) for f, digest in digests.items()}
+
+    outputs = []
+    for f in digests:
+        if cached[f] is None:
+            outputs.append((f"work_{work_stem(f)}.png", f, (f,)))
         else:
-            transparent = remove_white_background(cropped, threshold=232)
-        
-        # Trim any remaining transparent edges
-        trimmed = trim_transparent(transparent, padding=5)
-        
-        if trimmed.width < 50 or trimmed.height < 50:
-            print(f"    Skipping (too small after trim)")
-            continue
-        
-        # For very large images, resize to reasonable web size (max 1200px)
-        max_dim = 1200
-        if trimmed.width > max_dim or trimmed.height > max_dim:
-            ratio = min(max_dim / trimmed.width, max_dim / trimmed.height)
-            new_w = int(trimmed.width * ratio)
-            new_h = int(trimmed.height * ratio)
-            trimmed = trimmed.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            print(f"    Resized to: {new_w}x{new_h}")
-        
-        # Clean up the name
-        stem = f.stem
-        # Shorten very long freepik-style names
-        if len(stem) > 40:
-            # Take first meaningful part
-            parts = stem.split("_")
-            stem = "_".join(parts[:5])
-        stem = stem.replace(" ", "_").replace("-", "_")
-        
-        name = f"work_{stem}.png"
-        out_path = out / name
-        trimmed.save(out_path, "PNG", optimize=True)
-        work_count += 1
-        print(f"    ✅ Saved: {name} ({trimmed.width}x{trimmed.height})")
-    
-    print(f"\n  Total work images: {work_count}")
-    return work_count
+            outputs += [(name, f, None) for name in cached[f]]
+    planned = plan_outputs(outputs)
+
+    jobs = [(name, f) for name, (f, job) in planned.items() if job]
+    results = []
+    for (name, f), result in zip(jobs, run_jobs(work_job, [(f, out / name, WORK_PARAMS) for name, f in jobs], workers)):
+        print(f"\n  Processing work: {f.name}")
+        for line in result["log"]:
+            print(f"    {line}")
+        results.append(result)
+
+    return finish("work images", cache, digests, cached, planned, results, started)
 
 
 if __name__ == "__main__":
-    SRC_AVATAR = "/home/jimmy/Descargas/empliq/avatars"
-    SRC_WORK = "/home/jimmy/Descargas/empliq/trabajo"
-    OUT_BASE = "/home/jimmy/sueldos-organigrama/apps/website/public/illustrations"
-    
+    parser = argparse.ArgumentParser(description="Process avatar and work illustrations for the website")
+    parser.add_argument("--src-avatars", default="/home/jimmy/Descargas/empliq/avatars")
+    parser.add_argument("--src-work", default="/home/jimmy/Descargas/empliq/trabajo")
+    parser.add_argument("--out", default="/home/jimmy/sueldos-organigrama/apps/website/public/illustrations",
+                        help="Output base (avatars/ and work/ are created inside)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes (default: 1 = serial)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the output cache and rebuild everything")
+    args = parser.parse_args()
+    OUT_BASE = args.out
+
+    if "avif" not in VARIANT_FORMATS:
+        print("⚠️  This Pillow has no AVIF support (needs >= 11.2 or pillow-avif-plugin): "
+              "writing WebP variants only, manifest.json will have no AVIF entries\n")
+
     print("=" * 60)
     print("🎨 AVATAR PROCESSING")
     print("=" * 60)
-    avatar_count = process_avatars(SRC_AVATAR, f"{OUT_BASE}/avatars")
-    
+    avatar_count = process_avatars(args.src_avatars, f"{OUT_BASE}/avatars", args.workers, args.force)
+
     print("\n" + "=" * 60)
     print("💼 WORK ILLUSTRATION PROCESSING")
     print("=" * 60)
-    work_count = process_work(SRC_WORK, f"{OUT_BASE}/work")
-    
+    work_count = process_work(args.src_work, f"{OUT_BASE}/work", args.workers, args.force)
+
     print("\n" + "=" * 60)
-    print(f"🎉 DONE! {avatar_count} avatars + {work_count} work images")
+    print(f"🎉 DONE! {avatar_count} avatars + {work_count} work images ({args.workers} workers)")
     print(f"   Output: {OUT_BASE}")
     print("=" * 60)
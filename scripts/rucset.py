@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Conjunto compacto de RUCs para los lookups de "ya procesado".
+
+Un set de str con los ~872K RUCs de all_companies.csv ocupa decenas de MB
+por proceso. RucSet guarda los RUCs como un array int64 ordenado y único
+(8 bytes por RUC, ~7MB) y resuelve la pertenencia con searchsorted, tanto
+para un RUC suelto como para un lote completo de una sola vez.
+
+Se persiste como .npy y se carga con mmap (instantáneo, páginas compartidas
+entre procesos):
+
+    rucs = RucSet.from_csv(EXISTING)          # o RucSet.cached(EXISTING)
+    rucs.save("all_companies.rucs.npy")
+    rucs = RucSet.load("all_companies.rucs.npy")
+    mask = rucs.contains(["20100047218", "20600000001"])   # array de bool
+
+Uso como script (regenera el cache de un CSV):
+    python3 rucset.py /ruta/all_companies.csv
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+
+MAX_DIGITS = 18  # cualquier entero de 18 dígitos entra en int64
+
+
+def to_int64(rucs: Iterable) -> np.ndarray:
+    """
+    RUCs (str o int) → int64; los que no son numéricos ('²', '20ABC', None) o
+    no entran en int64 quedan en -1 (nunca pertenecen), sin lanzar error.
+    """
+    if isinstance(rucs, np.ndarray) and rucs.dtype.kind in 'iu':
+        return rucs.astype(np.int64, copy=False)
+    out = []
+    for ruc in rucs:
+        if isinstance(ruc, str):
+            ruc = ruc.strip()
+            out.append(int(ruc) if ruc.isascii() and ruc.isdigit() and len(ruc) <= MAX_DIGITS else -1)
+        else:
+            try:
+                ruc = int(ruc)
+            except (TypeError, ValueError, OverflowError):  # None, NaN, inf
+                ruc = -1
+            out.append(ruc if 0 <= ruc < 10 ** MAX_DIGITS else -1)
+    return np.array(out, dtype=np.int64)
+
+
+class RucSet:
+    """Array int64 ordenado y sin duplicados con pertenencia vectorizada."""
+
+    def __init__(self, rucs: np.ndarray | None = None):
+        self.rucs = np.empty(0, dtype=np.int64) if rucs is None else rucs
+
+    @classmethod
+    def from_iterable(cls, rucs: Iterable) -> 'RucSet':
+        values = to_int64(rucs)
+        return cls(np.unique(values[values >= 0]))
+
+    @classmethod
+    def from_csv(cls, path: Path, column: str = 'RUC') -> 'RucSet':
+        """RUCs de una columna de un CSV (por defecto la de all_companies.csv)."""
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            return cls.from_iterable(row[column] for row in reader)
+
+    @classmethod
+    def load(cls, path: Path) -> 'RucSet':
+        return cls(np.load(path, mmap_mode='r'))
+
+    @classmethod
+    def cached(cls, csv_path: Path, column: str = 'RUC') -> 'RucSet':
+        """from_csv con cache .rucs.npy junto al CSV; se regenera si el CSV es más nuevo."""
+        csv_path = Path(csv_path)
+        cache = csv_path.with_suffix('.rucs.npy')
+        try:
+            if cache.stat().st_mtime >= csv_path.stat().st_mtime:
+                return cls.load(cache)
+        except FileNotFoundError:
+            pass
+        rucs = cls.from_csv(csv_path, column)
+        try:
+            rucs.save(cache)
+        except OSError:
+            pass  # directorio de solo lectura: se usa sin cache
+        return rucs
+
+    def save(self, path: Path):
+        # np.save agrega .npy si falta; se escribe a un temporal para no dejar caches a medias
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.rucs))
+        tmp.replace(path)
+
+    def contains(self, rucs: Iterable) -> np.ndarray:
+        """Máscara bool de pertenencia para un lote de RUCs (str, int o array)."""
+        values = to_int64(rucs)
+        if not len(self.rucs):
+            return np.zeros(len(values), dtype=bool)
+        idx = np.searchsorted(self.rucs, values)
+        idx[idx == len(self.rucs)] = 0
+        return self.rucs[idx] == values
+
+    def __contains__(self, ruc) -> bool:
+        return bool(self.contains([ruc])[0])
+
+    def __len__(self) -> int:
+        return len(self.rucs)
+
+    def __iter__(self):
+        return (str(ruc) for ruc in self.rucs)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit(f"Uso: {sys.argv[0]} /ruta/archivo.csv")
+    src = Path(sys.argv[1])
+    rucs = RucSet.from_csv(src)
+    cache = src.with_suffix('.rucs.npy')
+    rucs.save(cache)
+    print(f"{len(rucs):,} RUCs → {cache} ({cache.stat().st_size / 1024 / 1024:.1f} MB)")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Company slugs — one translation table shared by Python and SQL.
+
+SLUG_TABLE maps A-Z to a-z and every letter of the BMP Latin blocks
+(Latin-1, Extended-A/B, Extended Additional: U+00C0–U+024F, U+1E00–U+1EFF) to
+its ASCII base, precomputed from the NFKD decomposition. Letters NFKD does
+not decompose take their base from the Unicode name ("LATIN SMALL LETTER B
+WITH STROKE" → b) or from a short list (æ, ø, ß, ...). A slug is then one
+str.translate + one regex, with no per-character replace loops and no
+locale-dependent lower(). Anything the table does not map becomes '-'.
+
+The SQL function used by migrate_full_dblink.sql is generated from the same
+table, so both sides produce identical slugs:
+
+    generate_slug("Compañía Minera Ångström S.A.")   # 'compania-minera-angstrom-s-a'
+    generate_slugs(df["name"])                       # list / Series at once
+    python3 slugs.py --sql                           # print the SQL function
+    python3 slugs.py --check                         # offline: Python vs the SQL's replace/translate
+    python3 slugs.py --verify "host=... dbname=..."  # random Python vs SQL check on a server
+"""
+
+import argparse
+import random
+import re
+import sys
+import unicodedata
+from typing import Iterable
+
+# Letters without an NFKD decomposition to ASCII
+_EXTRA = {
+    "Æ": "ae", "æ": "ae", "Ð": "d", "ð": "d", "Ø": "o", "ø": "o",
+    "Þ": "th", "þ": "th", "ß": "ss", "Đ": "d", "đ": "d", "Ħ": "h", "ħ": "h",
+    "ı": "i", "ĸ": "k", "Ł": "l", "ł": "l", "Œ": "oe", "œ": "oe", "Ŧ": "t", "ŧ": "t",
+    "Ǣ": "ae", "ǣ": "ae", "Ǽ": "ae", "ǽ": "ae", "ẞ": "ss",
+}
+
+# Latin-1 Supplement letters, Latin Extended-A/B, Latin Extended Additional
+LATIN_RANGES = ((0x00C0, 0x0250), (0x1E00, 0x1F00))
+
+# "LATIN CAPITAL LETTER D WITH HOOK" → d
+_LETTER_WITH = re.compile(r"LATIN (?:CAPITAL|SMALL) LETTER ([A-Z]) WITH ")
+
+
+def _base(char: str) -> str:
+    base = _EXTRA.get(char)
+    if base is None:
+        base = "".join(c for c in unicodedata.normalize("NFKD", char) if c.isascii() and c.isalnum()).lower()
+    if not base:
+        match = _LETTER_WITH.match(unicodedata.name(char, ""))
+        base = match.group(1).lower() if match else ""
+    return base
+
+
+def _build_table() -> dict[str, str]:
+    table = {chr(c): chr(c).lower() for c in range(ord("A"), ord("Z") + 1)}
+    for start, stop in LATIN_RANGES:
+        for code in range(start, stop):
+            base = _base(chr(code))
+            if base:
+                table[chr(code)] = base
+    return table
+
+
+SLUG_CHARS = _build_table()
+SLUG_TABLE = str.maketrans(SLUG_CHARS)
+
+_NOT_SLUG = re.compile(r"[^a-z0-9]+")
+_NOT_SLUG_BATCH = re.compile(r"[^a-z0-9\x00]+")
+
+
+def generate_slug(name: str | None) -> str:
+    """Generate URL-safe slug from company name ('' if nothing is left)."""
+    return _NOT_SLUG.sub("-", (name or "").translate(SLUG_TABLE)).strip("-")
+
+
+def generate_slugs(names: Iterable):
+    """
+    Slugs for a whole list / pandas Series: the names are joined with NUL,
+    translated and regex-replaced in a single pass, then split back. A NUL
+    inside a name is a separator like any other non-slug character, so it
+    is replaced by '-' before joining (same slug as generate_slug).
+    Returns a list, or a Series with the same index for Series input.
+    """
+    values = ["" if n is None or n != n else str(n).replace("\x00", "-") for n in names]  # None / NaN → ''
+    joined = _NOT_SLUG_BATCH.sub("-", "\x00".join(values).translate(SLUG_TABLE))
+    slugs = [s.strip("-") for s in joined.split("\x00")] if values else []
+    assert len(slugs) == len(values), "NUL left in a name"
+    if hasattr(names, "index") and hasattr(names, "to_list"):
+        return type(names)(slugs, index=names.index, name=names.name)
+    return slugs
+
+
+def sql_function(name: str = "pg_temp.generate_slug") -> str:
+    """CREATE FUNCTION equivalent to generate_slug(), built from SLUG_CHARS."""
+    single = {k: v for k, v in SLUG_CHARS.items() if len(v) == 1}
+    multi = {k: v for k, v in SLUG_CHARS.items() if len(v) > 1}
+    lines = [
+        f"CREATE OR REPLACE FUNCTION {name}(input_name TEXT)",
+        "RETURNS TEXT AS $$",
+        "DECLARE",
+        "  result TEXT;",
+        "BEGIN",
+        "  result := COALESCE(input_name, '');",
+    ]
+    lines += [f"  result := replace(result, '{k}', '{v}');" for k, v in multi.items()]
+    lines += [
+        "  result := translate(result,",
+        f"    '{''.join(single)}',",
+        f"    '{''.join(single.values())}');",
+        "  result := regexp_replace(result, '[^a-z0-9]+', '-', 'g');",
+        "  RETURN trim(both '-' from result);",
+        "END;",
+        "$$ LANGUAGE plpgsql IMMUTABLE;",
+    ]
+    return "\n".join(lines)
+
+
+def sql_translate(name: str | None, sql: str | None = None) -> str:
+    """
+    Apply the replace()/translate()/regexp_replace steps of sql_function() in
+    Python, read back from the generated SQL text (no database needed).
+    """
+    sql = sql or sql_function()
+    result = name or ""
+    for old, new in re.findall(r"replace\(result, '([^']*)', '([^']*)'\)", sql):
+        result = result.replace(old, new)
+    src, dst = re.search(r"translate\(result,\s*'([^']*)',\s*'([^']*)'\)", sql).groups()
+    result = result.translate(str.maketrans(src, dst))
+    return re.sub(r"[^a-z0-9]+", "-", result).strip("-")
+
+
+def random_names(n: int, seed: int = 0) -> list[str]:
+    """Random names mixing table letters, ASCII, punctuation/whitespace and other Unicode."""
+    rng = random.Random(seed)
+    alphabet = (
+        list(SLUG_CHARS) + list("abcxyz0123456789") + list(" -_.,&'/\t\n")
+        + ["ª", "º", "×", "İ", "ǅ", "ɐ", "ʒ", "Ω", "Ж", "中", "́", "🙂", " "]
+    )
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24))) for _ in range(n)]
+
+
+def check(n: int = 20_000) -> int:
+    """
+    Compare generate_slugs() against sql_translate() on n random names;
+    returns mismatches. This only checks that the generated SQL text encodes
+    the same table; running the function on a server is verify()'s job.
+    """
+    names = random_names(n)
+    sql = sql_function()
+    mismatches = [(name, py, sql_slug) for name, py in zip(names, generate_slugs(names))
+                  if py != (sql_slug := sql_translate(name, sql))]
+    for name, py, sql_slug in mismatches[:10]:
+        print(f"   ❌ {name!r}: python={py!r} sql={sql_slug!r}")
+    # NUL never reaches Postgres, but must not misalign a batch
+    with_nul = [f"{name}\x00{name}" for name in names]
+    batch_mismatches = sum(generate_slug(name) != slug for name, slug in zip(with_nul, generate_slugs(with_nul)))
+    print(f"{n:,} random names: {len(mismatches)} Python/SQL-mapping mismatches, {batch_mismatches} batch/single mismatches with NUL")
+    return len(mismatches) + batch_mismatches
+
+
+def verify(dsn: str, n: int = 20_000) -> int:
+    """Compare generate_slug() against the SQL function on n random names; returns mismatches."""
+    import psycopg2
+
+    names = random_names(n)
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql_function())
+            cur.execute("SELECT pg_temp.generate_slug(n) FROM unnest(%s::text[]) WITH ORDINALITY AS t(n, i) ORDER BY i", (names,))
+            sql_slugs = [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+    mismatches = [(name, py, sql) for name, py, sql in zip(names, generate_slugs(names), sql_slugs) if py != sql]
+    batch_mismatches = sum(generate_slug(name) != slug for name, slug in zip(names, generate_slugs(names)))
+    for name, py, sql in mismatches[:10]:
+        print(f"   ❌ {name!r}: python={py!r} sql={sql!r}")
+    print(f"{n:,} random names: {len(mismatches)} Python/SQL mismatches, {batch_mismatches} batch/single mismatches")
+    return len(mismatches) + batch_mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Company slug table (Python + SQL)")
+    parser.add_argument("--sql", action="store_true", help="Print the SQL generate_slug function")
+    parser.add_argument("--check", action="store_true", help="Check Python vs the SQL function's mapping, offline")
+    parser.add_argument("--verify", metavar="DSN", help="Check Python vs SQL slugs on random names")
+    parser.add_argument("-n", type=int, default=20_000, help="Random names for --check / --verify")
+    args = parser.parse_args()
+
+    if args.sql:
+        print(sql_function())
+    elif args.check:
+        sys.exit(1 if check(args.n) else 0)
+    elif args.verify:
+        sys.exit(1 if verify(args.verify, args.n) else 0)
+    else:
+        for line in sys.stdin:
+            print(generate_slug(line.rstrip("\n")))
@@ -13,64 +13,10 @@ import argparse
 import sys
 from pathlib import Path
 
-from PIL import Image, ImageFilter
+from PIL import Image
 import numpy as np
 
-
-def remove_white_background(img: Image.Image, threshold: int = 230) -> Image.Image:
-    """Remueve el fondo blanco y lo convierte en transparente."""
-    img = img.convert("RGBA")
-    data = np.array(img)
-
-    # Pixels donde R, G, B son todos >= threshold → fondo blanco
-    white_mask = (data[:, :, 0] >= threshold) & \
-                 (data[:, :, 1] >= threshold) & \
-                 (data[:, :, 2] >= threshold)
-
-    # Hacer transparentes los pixels blancos
-    data[white_mask, 3] = 0
-
-    # Anti-alias: para pixels semi-blancos cerca de bordes, hacerlos semi-transparentes
-    near_white = (data[:, :, 0] >= threshold - 30) & \
-                 (data[:, :, 1] >= threshold - 30) & \
-                 (data[:, :, 2] >= threshold - 30) & \
-                 ~white_mask
-    avg_brightness = (
-        data[near_white, 0].astype(int) +
-        data[near_white, 1].astype(int) +
-        data[near_white, 2].astype(int)
-    ) / 3
-    data[near_white, 3] = np.clip(
-        255 - ((avg_brightness - (threshold - 30)) / 30 * 255), 0, 255
-    ).astype(np.uint8)
-
-    return Image.fromarray(data)
-
-
-def trim_transparent(img: Image.Image, padding: int = 5) -> Image.Image:
-    """Recorta el espacio transparente alrededor del contenido."""
-    data = np.array(img)
-    alpha = data[:, :, 3]
-
-    # Encontrar filas/columnas con contenido no transparente
-    rows_with_content = np.any(alpha > 10, axis=1)
-    cols_with_content = np.any(alpha > 10, axis=0)
-
-    if not rows_with_content.any() or not cols_with_content.any():
-        return img
-
-    top = np.argmax(rows_with_content)
-    bottom = len(rows_with_content) - np.argmax(rows_with_content[::-1])
-    left = np.argmax(cols_with_content)
-    right = len(cols_with_content) - np.argmax(cols_with_content[::-1])
-
-    # Agregar padding
-    top = max(0, top - padding)
-    bottom = min(img.height, bottom + padding)
-    left = max(0, left - padding)
-    right = min(img.width, right + padding)
-
-    return img.crop((left, top, right, bottom))
+from image_ops import remove_background
 
 
 def detect_grid(img: Image.Image, expected_cols: int, expected_rows: int):
@@ -186,11 +132,8 @@ def split_avatars(
     for i, (x1, y1, x2, y2) in enumerate(cells):
         cell_img = img.crop((x1, y1, x2, y2))
 
-        # Remover fondo blanco
-        transparent = remove_white_background(cell_img, threshold=white_threshold)
-
-        # Recortar espacio vacío
-        trimmed = trim_transparent(transparent, padding=8)
+        # Remover fondo blanco (anti-alias en los 30 niveles bajo el umbral) y recortar espacio vacío
+        trimmed = remove_background(cell_img, white_threshold, band=30, padding=8)
 
         # Redimensionar si se especifica tamaño
         if target_size and trimmed.width > 0 and trimmed.height > 0: